@@ -16,6 +16,7 @@ class Settings(BaseSettings):
     model_info_artifact: str = Field(default="ml/artifacts/model_info.json", alias="MODEL_INFO_ARTIFACT")
     allowed_origins: str = Field(default="http://localhost:5173", alias="ALLOWED_ORIGINS")
     config_yaml: str = Field(default="config/config.yaml", alias="CONFIG_YAML")
+    stream_max_samples: int = Field(default=500, alias="STREAM_MAX_SAMPLES")
 
     class Config:
         env_file = ".env"
@@ -1,14 +1,29 @@
 from __future__ import annotations
 
+import json
+import math
 import pathlib
-from typing import Annotated
-
-from fastapi import Depends, FastAPI, File, HTTPException, UploadFile
+import time
+from typing import Annotated, Literal, Union
+
+from fastapi import (
+    Depends,
+    FastAPI,
+    File,
+    HTTPException,
+    Query,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 
 from .config import load_settings
 from .schemas import (
     AggregatePrediction,
+    ColumnarPredictResponse,
     EvaluateResponse,
     HealthResponse,
     ModelInfo,
@@ -17,6 +32,9 @@ from .schemas import (
 )
 from .service import ModelService
 
+# mhealth is importable once .service has put ml/src on sys.path.
+from mhealth.constants import SENSOR_COLUMNS  # noqa: E402
+
 settings = load_settings()
 try:
     service = ModelService(settings)
@@ -66,15 +84,84 @@ def _validate_file(file: UploadFile) -> None:
         raise HTTPException(status_code=400, detail="Solo se aceptan archivos .log.")
 
 
-@app.post("/predict", response_model=PredictResponse)
+@app.post("/predict", response_model=Union[PredictResponse, ColumnarPredictResponse])
 async def predict(
-    file: UploadFile = File(...), svc: ModelService = Depends(_get_service)
-) -> PredictResponse:
+    file: UploadFile = File(...),
+    format: Literal["default", "columnar"] = Query("default"),
+    proba: Literal["float", "float16", "uint8"] = Query("float"),
+    svc: ModelService = Depends(_get_service),
+) -> Union[PredictResponse, JSONResponse]:
     _validate_file(file)
+    if format == "columnar":
+        # Documented by ColumnarPredictResponse but returned as-is: no
+        # validation pass over the (windows x classes) matrix for long logs.
+        return JSONResponse(svc.predict_columnar(file, proba_encoding=proba))
     result = svc.predict(file)
     return PredictResponse(**result)
 
 
+def _stream_samples(message: object) -> list:
+    """
+    Samples of one /stream message; ValueError (sent back to the client as
+    ``{"error": ...}``) if it is not ``{"samples": [[23 numbers], ...]}``.
+    """
+    if not isinstance(message, dict):
+        raise ValueError('El mensaje debe ser un objeto JSON {"samples": [...]}.')
+    samples = message.get("samples") or []
+    if not isinstance(samples, list):
+        raise ValueError('"samples" debe ser una lista de filas.')
+    if len(samples) > settings.stream_max_samples:
+        raise ValueError(f"Máximo {settings.stream_max_samples} muestras por mensaje.")
+    for row in samples:
+        if (
+            not isinstance(row, list)
+            or len(row) != len(SENSOR_COLUMNS)
+            or not all(
+                isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v)
+                for v in row
+            )
+        ):
+            raise ValueError(
+                f"Cada muestra debe ser una lista de {len(SENSOR_COLUMNS)} números."
+            )
+    return samples
+
+
+@app.websocket("/stream")
+async def stream(websocket: WebSocket, svc: ModelService = Depends(_get_service)) -> None:
+    """
+    Live predictions: each message is ``{"samples": [[23 floats], ...]}``
+    (optionally with a client timestamp ``t``, echoed back). Every message
+    gets a reply with the predictions of the windows it completed and the
+    server-side latency from receiving the samples to having them; invalid
+    messages get ``{"error": ...}`` and the connection stays open.
+    """
+    await websocket.accept()
+    predictor = svc.streaming_predictor()
+    try:
+        while True:
+            text = await websocket.receive_text()
+            received_at = time.perf_counter()
+            try:
+                message = json.loads(text)
+                samples = _stream_samples(message)
+                # Featurizing and predicting is CPU-bound; keep it off the event loop.
+                predictions = await run_in_threadpool(predictor.push, samples)
+            except ValueError as exc:  # JSONDecodeError is a ValueError
+                await websocket.send_json({"error": str(exc)})
+                continue
+            await websocket.send_json(
+                {
+                    "predictions": predictions,
+                    "received": predictor.received,
+                    "latency_ms": (time.perf_counter() - received_at) * 1e3,
+                    "t": message.get("t"),
+                }
+            )
+    except WebSocketDisconnect:
+        pass
+
+
 @app.post("/evaluate-log", response_model=EvaluateResponse)
 async def evaluate_log(
     file: UploadFile = File(...), svc: ModelService = Depends(_get_service)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel
 
@@ -26,6 +26,18 @@ class PredictResponse(BaseModel):
     aggregate: AggregatePrediction
 
 
+class ColumnarPredictResponse(BaseModel):
+    format: Literal["columnar"]
+    n_windows: int
+    classes: List[int]
+    activities: List[str]
+    predictions: List[int]
+    proba_encoding: Literal["float", "float16", "uint8"]
+    proba_scale: int
+    proba: List[List[float]]
+    aggregate: AggregatePrediction
+
+
 class ModelInfo(BaseModel):
     version: str
     model_type: str
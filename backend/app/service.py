@@ -7,7 +7,6 @@ from typing import Any, Dict
 
 import numpy as np
 from fastapi import HTTPException, UploadFile
-from sklearn.metrics import accuracy_score, confusion_matrix, f1_score
 
 # Ensure mhealth package is importable
 ROOT = pathlib.Path(__file__).resolve().parents[2]
@@ -16,9 +15,11 @@ sys.path.append(str(ROOT / "ml" / "src"))
 from mhealth.config import load_config
 from mhealth.constants import LABEL_COLUMN, SUBJECT_COLUMN
 from mhealth.inference import (
+    StreamingPredictor,
     ensure_feature_order,
     load_artifacts,
     predict_windows,
+    predict_windows_columnar,
     prepare_features_from_log,
 )
 from mhealth.utils import load_json
@@ -30,7 +31,10 @@ class ModelService:
     def __init__(self, settings: Settings):
         self.settings = settings
         self.config = load_config(settings.config_yaml)
-        self.model, self.feature_columns, self.model_info = load_artifacts(self.config)
+        # MODEL_ARTIFACT selects the served model (full forest or distilled student)
+        self.model, self.feature_columns, self.model_info = load_artifacts(
+            self.config, model_path=settings.model_artifact
+        )
         try:
             self.metrics = load_json(self.settings.metrics_artifact)
         except FileNotFoundError:
@@ -54,7 +58,23 @@ class ModelService:
         finally:
             path.unlink(missing_ok=True)
 
+    def predict_columnar(self, file: UploadFile, proba_encoding: str = "float") -> Dict[str, Any]:
+        path = self._save_upload(file)
+        try:
+            windows = prepare_features_from_log(path, self.config, subject_id=0)
+            feature_df = windows.drop(columns=[LABEL_COLUMN, SUBJECT_COLUMN])
+            return predict_windows_columnar(
+                self.model, feature_df, self.feature_columns, proba_encoding=proba_encoding
+            )
+        except Exception as exc:  # pragma: no cover - safety net
+            raise HTTPException(status_code=400, detail=str(exc))
+        finally:
+            path.unlink(missing_ok=True)
+
     def evaluate(self, file: UploadFile) -> Dict[str, Any]:
+        # Imported here so serving an exported ArrayForest never loads sklearn
+        from sklearn.metrics import accuracy_score, confusion_matrix, f1_score
+
         path = self._save_upload(file)
         try:
             windows = prepare_features_from_log(path, self.config, subject_id=0)
@@ -89,6 +109,9 @@ class ModelService:
         finally:
             path.unlink(missing_ok=True)
 
+    def streaming_predictor(self) -> StreamingPredictor:
+        return StreamingPredictor(self.model, self.feature_columns, self.config)
+
     def model_info_payload(self) -> Dict[str, Any]:
         info = self.model_info
         info["metrics"] = self.metrics
@@ -1,7 +1,38 @@
 import json
+import pathlib
+
+import numpy as np
+import pandas as pd
 from fastapi.testclient import TestClient
 
 from backend.app.main import app, _get_service
+from backend.app.schemas import ColumnarPredictResponse
+from mhealth.config import load_config
+from mhealth.constants import SENSOR_COLUMNS
+from mhealth.inference import ArrayForest, StreamingPredictor, export_forest
+from mhealth.modeling import build_pipeline
+from mhealth.preprocess import feature_names, window_features
+
+CONFIG_PATH = pathlib.Path(__file__).resolve().parents[2] / "config" / "config.yaml"
+
+
+class FakePredictor:
+    def __init__(self):
+        self.received = 0
+
+    def push(self, samples):
+        if any(row[0] < 0 for row in samples):
+            raise ValueError("bad sample")
+        self.received += len(samples)
+        return [
+            {
+                "window_index": 0,
+                "start_seconds": 0.0,
+                "prediction": 1,
+                "activity": "standing",
+                "proba": {"standing": 1.0},
+            }
+        ]
 
 
 class FakeService:
@@ -32,6 +63,22 @@ class FakeService:
             "aggregate": {"fraction_per_activity": {"standing": 1.0}, "mean_proba": {"standing": 0.7}},
         }
 
+    def predict_columnar(self, file, proba_encoding="float"):
+        return {
+            "format": "columnar",
+            "n_windows": 2,
+            "classes": [1, 2],
+            "activities": ["standing", "sitting"],
+            "predictions": [0, 1],
+            "proba_encoding": proba_encoding,
+            "proba_scale": 255,
+            "proba": [[179, 76], [51, 204]],
+            "aggregate": {"fraction_per_activity": {"standing": 0.5, "sitting": 0.5}, "mean_proba": {"standing": 0.45, "sitting": 0.55}},
+        }
+
+    def streaming_predictor(self):
+        return FakePredictor()
+
     def evaluate(self, file):
         return {"metrics": {"accuracy": 1.0, "macro_f1": 1.0, "confusion_matrix": [[1]]}, "predictions": [1]}
 
@@ -62,6 +109,104 @@ def test_predict():
     assert "per_window" in data
 
 
+def test_predict_columnar():
+    resp = client.post(
+        "/predict?format=columnar&proba=uint8",
+        files={"file": ("test.log", "1 2 3 4")},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert "per_window" not in data
+    assert data["proba_encoding"] == "uint8"
+    assert len(data["predictions"]) == len(data["proba"]) == data["n_windows"]
+    ColumnarPredictResponse.model_validate(data)
+
+    schema = client.get("/openapi.json").json()
+    response = schema["paths"]["/predict"]["post"]["responses"]["200"]
+    refs = json.dumps(response["content"]["application/json"]["schema"])
+    assert "ColumnarPredictResponse" in refs and "PredictResponse" in refs
+
+
+def test_stream():
+    with client.websocket_connect("/stream") as ws:
+        ws.send_json({"samples": [[0.0] * 23] * 10, "t": 123})
+        data = ws.receive_json()
+        assert data["received"] == 10
+        assert data["t"] == 123
+        assert data["predictions"][0]["activity"] == "standing"
+        assert data["latency_ms"] >= 0
+        ws.send_json({"samples": [[-1.0] * 23]})
+        assert ws.receive_json() == {"error": "bad sample"}
+        ws.send_json({"samples": [[0.0] * 23]})
+        assert ws.receive_json()["received"] == 11
+
+
+def test_stream_bad_frames():
+    with client.websocket_connect("/stream") as ws:
+        for frame in [
+            "{not json",
+            '"x"',
+            "[1, 2]",
+            '{"samples": "abc"}',
+            '{"samples": [[0.0, 0.0]]}',
+            json.dumps({"samples": [["a"] * 23]}),
+        ]:
+            ws.send_text(frame)
+            assert "error" in ws.receive_json()
+        ws.send_json({"samples": [[0.0] * 23] * 3})
+        assert ws.receive_json()["received"] == 3
+
+
+class TinyForestService:
+    """
+    Serves a real StreamingPredictor over a tiny exported forest.
+    """
+
+    def __init__(self, tmp_path):
+        self.config = load_config(CONFIG_PATH)
+        self.columns = feature_names(SENSOR_COLUMNS, self.config.features["stats"])
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.normal(size=(200, len(self.columns))), columns=self.columns)
+        pipeline = build_pipeline(self.config, n_jobs=1, n_estimators=5, max_depth=4)
+        pipeline.fit(X, rng.integers(1, 4, size=200))
+        self.model = ArrayForest.load(export_forest(pipeline, tmp_path / "tiny.npz", self.columns))
+
+    def streaming_predictor(self):
+        return StreamingPredictor(self.model, self.columns, self.config)
+
+
+def test_stream_real_predictor(tmp_path):
+    svc = TinyForestService(tmp_path)
+    app.dependency_overrides[_get_service] = lambda: svc
+    try:
+        config = svc.config
+        window = int(config.window_seconds * config.sample_rate_hz)
+        step = window - int(config.window_overlap_seconds * config.sample_rate_hz)
+        # One message short of a window, then one that completes two.
+        samples = np.random.default_rng(1).normal(size=(window + step, 23)).round(4)
+        with client.websocket_connect("/stream") as ws:
+            ws.send_json({"samples": samples[: window - 1].tolist()})
+            assert ws.receive_json()["predictions"] == []
+            ws.send_json({"samples": samples[window - 1 :].tolist()})
+            data = ws.receive_json()
+    finally:
+        app.dependency_overrides[_get_service] = lambda: FakeService()
+
+    X, _ = window_features(
+        samples, np.full(len(samples), -1), window, step, config.features["stats"]
+    )
+    expected = svc.model.predict_proba(X)
+    assert data["received"] == len(samples)
+    assert [p["window_index"] for p in data["predictions"]] == [0, 1]
+    assert [p["start_seconds"] for p in data["predictions"]] == [
+        0.0,
+        step / config.sample_rate_hz,
+    ]
+    np.testing.assert_array_equal(
+        [list(p["proba"].values()) for p in data["predictions"]], expected
+    )
+
+
 def test_evaluate():
     resp = client.post(
         "/evaluate-log",
@@ -8,22 +8,22 @@ ROOT = pathlib.Path(__file__).resolve().parent
 sys.path.append(str(ROOT / "src"))
 
 from mhealth.config import load_config
-from mhealth.data import load_dataset
+from mhealth.data import MHealthDataset
 from mhealth.constants import LABEL_COLUMN, SUBJECT_COLUMN
 
 
 def analyze_subject(subject_id: int):
     config = load_config("config/config.yaml")
-    print(f"Loading dataset...")
-    df = load_dataset(config)
+    dataset = MHealthDataset(config)
 
-    # Filter for specific subject
-    subj_df = df[df[SUBJECT_COLUMN] == subject_id].copy()
-
-    if len(subj_df) == 0:
+    if subject_id not in dataset:
         print(f"Subject {subject_id} not found in dataset!")
         return
 
+    # Only this subject's log is parsed
+    print(f"Loading subject {subject_id}...")
+    subj_df = dataset.subject(subject_id)
+
     print(f"\n{'=' * 60}")
     print(f"Subject {subject_id} Analysis")
     print(f"{'=' * 60}")
@@ -0,0 +1,82 @@
+"""Regression benchmark: mhealth.parsing.read_log vs the previous pandas reader."""
+from __future__ import annotations
+
+import argparse
+import pathlib
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = pathlib.Path(__file__).resolve().parent
+sys.path.append(str(ROOT / "src"))
+
+from mhealth.constants import RAW_DIR
+from mhealth.parsing import read_log
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the .log parser.")
+    parser.add_argument(
+        "logs",
+        nargs="*",
+        help="Log files to parse (default: every mHealth_subject*.log under RAW_DIR).",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per file (best is kept).")
+    parser.add_argument(
+        "--max-ratio",
+        type=float,
+        default=1.0,
+        help="Fail if read_log takes longer than this fraction of the pandas time.",
+    )
+    return parser.parse_args()
+
+
+def pandas_reader(path: pathlib.Path) -> np.ndarray:
+    return pd.read_csv(path, sep=r"\s+", header=None).to_numpy(dtype=np.float64)
+
+
+def best_time(fn, path: pathlib.Path, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    args = parse_args()
+    paths = [pathlib.Path(p) for p in args.logs] or sorted(
+        RAW_DIR.glob("**/mHealth_subject*.log")
+    )
+    if not paths:
+        print(f"No logs found under {RAW_DIR}; pass paths explicitly.")
+        sys.exit(1)
+
+    total_ref = total_new = 0.0
+    print(f"{'file':<28}{'rows':>9}{'pandas (s)':>12}{'read_log (s)':>14}{'speedup':>9}")
+    for path in paths:
+        reference = pandas_reader(path)
+        parsed = read_log(path)
+        if not np.array_equal(reference, parsed):
+            print(f"MISMATCH: {path}")
+            sys.exit(1)
+        t_ref = best_time(pandas_reader, path, args.repeat)
+        t_new = best_time(read_log, path, args.repeat)
+        total_ref += t_ref
+        total_new += t_new
+        print(
+            f"{path.name:<28}{len(parsed):>9}{t_ref:>12.4f}{t_new:>14.4f}{t_ref / t_new:>8.2f}x"
+        )
+
+    ratio = total_new / total_ref
+    print(f"\nTotal: pandas {total_ref:.3f}s, read_log {total_new:.3f}s ({1 / ratio:.2f}x)")
+    if ratio > args.max_ratio:
+        print(f"REGRESSION: read_log/pandas = {ratio:.2f} > {args.max_ratio}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parent
+sys.path.append(str(ROOT / "src"))
+
+from mhealth.config import load_config
+from mhealth.data import MHealthDataset
+from mhealth.feature_store import FeatureStore
+from mhealth.inference import load_artifacts
+from mhealth.modeling import build_windows, distill_model, save_student
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Distill the trained forest into a compact student model."
+    )
+    parser.add_argument("--config", default="config/config.yaml", help="Config YAML.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = load_config(args.config)
+    teacher, _, model_info = load_artifacts(config)
+    splits = model_info["splits"]
+    dataset = MHealthDataset(config)
+    store = FeatureStore(config) if config.features.get("store", False) else None
+
+    def windows_for(subject_ids):
+        subject_ids = [s for s in subject_ids if s in dataset]
+        if store is not None:
+            return store.windows(dataset, subject_ids)
+        return build_windows(dataset.subjects(subject_ids), config)
+
+    print("Cargando ventanas de los splits del modelo entrenado...")
+    train_windows = windows_for(splits["train_subjects"])
+    eval_windows = {
+        name: windows_for(splits[f"{name}_subjects"]) for name in ("val", "test", "demo")
+    }
+
+    print("Destilando modelo compacto...")
+    result = distill_model(teacher, train_windows, eval_windows, config)
+    save_student(result, config)
+
+    info = result["info"]
+    for role in ("teacher", "student"):
+        stats = info[role]
+        print(
+            f"{role}: {stats['model_bytes'] / 2**20:.2f}MB, {stats['n_nodes']} nodos, "
+            f"latencia={stats['latency_ms']:.2f}ms, lote={stats['batch_us_per_window']:.1f}us/ventana"
+        )
+    for split, metrics in result["metrics"].items():
+        if metrics["accuracy"] is not None:
+            print(
+                f"{split}: acc={metrics['accuracy']:.4f}, macro_f1={metrics['macro_f1']:.4f}, "
+                f"acuerdo con el teacher={info['teacher_agreement'][split]:.4f}"
+            )
+    print(f"\nModelo guardado en {config.artifacts['student_model_path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,16 +5,17 @@ import pathlib
 import sys
 
 import numpy as np
-from sklearn.metrics import accuracy_score, confusion_matrix, f1_score
 
 ROOT = pathlib.Path(__file__).resolve().parent
 sys.path.append(str(ROOT / "src"))
 
 from mhealth.config import load_config
 from mhealth.constants import LABEL_COLUMN, SUBJECT_COLUMN
-from mhealth.data import load_dataset
+from mhealth.data import MHealthDataset
+from mhealth.feature_store import FeatureStore
 from mhealth.inference import ensure_feature_order, load_artifacts, prepare_features_from_log
-from mhealth.preprocess import create_windows, filter_demo_subjects
+from mhealth.modeling import evaluate_windows, prediction_metrics
+from mhealth.preprocess import create_windows, subject_rows
 
 
 def parse_args() -> argparse.Namespace:
@@ -23,44 +24,49 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--log", help="Optional path to a single .log file for evaluation.")
     parser.add_argument("--subject-id", type=int, default=0, help="Subject id for single log.")
     parser.add_argument("--split", choices=["val", "test", "demo", "train"], default="test")
+    parser.add_argument(
+        "--sample", type=int, help="Score only this many random windows of the split."
+    )
     return parser.parse_args()
 
 
-def evaluate_split(df, model, feature_cols, config, split_name: str, splits: dict) -> dict:
-    if split_name == "demo":
-        subset = df[df[SUBJECT_COLUMN].isin(config.excluded_subjects_demo)].copy()
-    else:
-        subset_subjects = splits.get(f"{split_name}_subjects")
-        subset = df[df[SUBJECT_COLUMN].isin(subset_subjects)].copy()
-    windows = create_windows(
+def split_windows(dataset, subject_ids, config):
+    """
+    Windows of the given subjects, with activity 0 dropped as in training.
+    """
+    if config.features.get("store", False):
+        return FeatureStore(config).windows(dataset, subject_ids)
+    subset = dataset.subjects(subject_ids)
+    return create_windows(
         subset,
         config.window_seconds,
         config.window_overlap_seconds,
         config.sample_rate_hz,
         feature_stats=config.features.get("stats"),
+        engine=config.features.get("engine", "batched"),
+        workers=int(config.features.get("workers", 1)),
+        rows=subject_rows(subset, drop_unlabeled=True),
     )
-    feature_df = windows.drop(columns=[LABEL_COLUMN, SUBJECT_COLUMN])
-    feature_df = ensure_feature_order(feature_df, feature_cols)
-    y_true = windows[LABEL_COLUMN]
-    preds = model.predict(feature_df)
-    acc = accuracy_score(y_true, preds)
-    f1 = f1_score(y_true, preds, average="macro")
-    cm = confusion_matrix(y_true, preds)
-    return {"accuracy": acc, "macro_f1": f1, "confusion_matrix": cm.tolist()}
+
+
+def evaluate_split(windows, model, feature_cols, sample=None, seed=0) -> dict:
+    ordered = ensure_feature_order(
+        windows.drop(columns=[LABEL_COLUMN, SUBJECT_COLUMN]), feature_cols
+    )
+    ordered[LABEL_COLUMN] = windows[LABEL_COLUMN]
+    ordered[SUBJECT_COLUMN] = windows[SUBJECT_COLUMN]
+    return evaluate_windows(model, ordered, sample=sample, seed=seed)
 
 
 def evaluate_log(log_path: pathlib.Path, model, feature_cols, config, subject_id: int) -> dict:
     windows = prepare_features_from_log(log_path, config, subject_id)
     feature_df = windows.drop(columns=[LABEL_COLUMN, SUBJECT_COLUMN])
     feature_df = ensure_feature_order(feature_df, feature_cols)
-    preds = model.predict(feature_df)
     proba = model.predict_proba(feature_df)
+    preds = model.classes_.take(np.argmax(proba, axis=1))
     metrics = {}
     if windows[LABEL_COLUMN].nunique() > 1 or windows[LABEL_COLUMN].unique()[0] != -1:
-        y_true = windows[LABEL_COLUMN]
-        metrics["accuracy"] = accuracy_score(y_true, preds)
-        metrics["macro_f1"] = f1_score(y_true, preds, average="macro")
-        metrics["confusion_matrix"] = confusion_matrix(y_true, preds).tolist()
+        metrics = prediction_metrics(windows[LABEL_COLUMN], preds)
     return {"predictions": preds.tolist(), "proba": proba.tolist(), "metrics": metrics}
 
 
@@ -74,10 +80,21 @@ def main() -> None:
         print(result)
         return
 
-    df = load_dataset(config)
-    # Remove demo subjects from main splits
-    remaining, _ = filter_demo_subjects(df, config.excluded_subjects_demo)
-    metrics = evaluate_split(remaining, model, feature_cols, config, args.split, model_info["splits"])
+    # Only parse the subjects of the requested split
+    dataset = MHealthDataset(config)
+    if args.split == "demo":
+        subject_ids = dataset.demo_subject_ids
+    else:
+        demo = set(config.excluded_subjects_demo)
+        subject_ids = [
+            s
+            for s in model_info["splits"][f"{args.split}_subjects"]
+            if s in dataset and s not in demo
+        ]
+    windows = split_windows(dataset, subject_ids, config)
+    metrics = evaluate_split(
+        windows, model, feature_cols, sample=args.sample, seed=config.random_seed
+    )
     print(metrics)
 
 
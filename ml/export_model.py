@@ -0,0 +1,151 @@
+"""Export the trained pipeline to NumPy arrays served by mhealth.inference.ArrayForest."""
+from __future__ import annotations
+
+import argparse
+import pathlib
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT = pathlib.Path(__file__).resolve().parent
+sys.path.append(str(ROOT / "src"))
+
+from mhealth.config import load_config
+from mhealth.constants import LABEL_COLUMN, SUBJECT_COLUMN
+from mhealth.data import MHealthDataset
+from mhealth.feature_store import FeatureStore
+from mhealth.inference import (
+    MEMMAP_META,
+    ArrayForest,
+    ensure_feature_order,
+    export_forest,
+    export_forest_memmap,
+)
+from mhealth.utils import load_json, save_json
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export the RF pipeline to arrays.")
+    parser.add_argument("--config", default="config/config.yaml", help="Config YAML.")
+    parser.add_argument(
+        "--format",
+        choices=["npz", "memmap"],
+        default="npz",
+        help="npz: one file loaded into memory; memmap: directory of .npy files mapped read-only.",
+    )
+    parser.add_argument(
+        "--leaf-bits",
+        type=int,
+        choices=[0, 8, 16],
+        default=0,
+        help="memmap only: quantize leaf distributions to 8/16-bit integers (0 keeps float64).",
+    )
+    parser.add_argument(
+        "--eval-split",
+        choices=["none", "val", "test"],
+        default="test",
+        help="memmap only: split whose accuracy delta is recorded in meta.json.",
+    )
+    parser.add_argument(
+        "--output",
+        help="Output .npz or directory (default: artifacts.array_model_path / memmap_model_dir).",
+    )
+    parser.add_argument(
+        "--check-windows", type=int, default=2000, help="Random windows used to verify the export."
+    )
+    return parser.parse_args()
+
+
+def best_time(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def split_accuracy_delta(config, split, pipeline, forest, feature_columns) -> dict:
+    """
+    Accuracy of the float64 pipeline and of the export on one held-out split.
+    """
+    dataset = MHealthDataset(config)
+    model_info = load_json(config.artifacts["model_info"])
+    subject_ids = [s for s in model_info["splits"][f"{split}_subjects"] if s in dataset]
+    windows = FeatureStore(config).windows(dataset, subject_ids)
+    features = ensure_feature_order(
+        windows.drop(columns=[LABEL_COLUMN, SUBJECT_COLUMN]), feature_columns
+    )
+    y_true = windows[LABEL_COLUMN].to_numpy()
+    reference = float(np.mean(pipeline.predict(features) == y_true))
+    exported = float(np.mean(forest.predict(features.to_numpy()) == y_true))
+    return {
+        "split": split,
+        "windows": int(len(y_true)),
+        "accuracy_float64": reference,
+        "accuracy_export": exported,
+        "accuracy_delta": exported - reference,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    config = load_config(args.config)
+    pipeline = joblib.load(config.artifacts["model_path"])
+    feature_columns = load_json(config.artifacts["feature_metadata"])["feature_columns"]
+    if args.format == "memmap":
+        output = pathlib.Path(
+            args.output
+            or config.artifacts.get("memmap_model_dir", "ml/artifacts/model_memmap")
+        )
+        export_forest_memmap(pipeline, output, feature_columns, leaf_bits=args.leaf_bits or None)
+        size = sum(f.stat().st_size for f in output.iterdir())
+    else:
+        if args.leaf_bits:
+            sys.exit("--leaf-bits requiere --format memmap")
+        output = pathlib.Path(args.output or config.artifacts["array_model_path"])
+        export_forest(pipeline, output, feature_columns)
+        size = output.stat().st_size
+    forest = ArrayForest.load(output)
+    print(f"Exportado: {output} ({size / 2**20:.2f}MB, {forest.n_trees} árboles)")
+
+    # Verify on windows drawn around the training distribution
+    scaler = pipeline.named_steps["scaler"]
+    rng = np.random.default_rng(config.random_seed)
+    X = scaler.mean_ + rng.normal(size=(args.check_windows, len(scaler.mean_))) * scaler.scale_ * 2
+    # The pipeline was fitted on a DataFrame; give it the same column names.
+    X_frame = pd.DataFrame(X, columns=feature_columns)
+    expected = pipeline.predict_proba(X_frame)
+    got = forest.predict_proba(X)
+    agreement = pipeline.predict(X_frame) == forest.predict(X)
+    same_labels = bool(agreement.all())
+    print(
+        f"Verificación ({len(X)} ventanas): probabilidades idénticas={np.array_equal(expected, got)}, "
+        f"max |Δp|={np.abs(expected - got).max():.2e}, mismas clases={same_labels}"
+    )
+    if args.format == "memmap":
+        delta = {
+            "check_windows": len(X),
+            "label_agreement": float(np.mean(agreement)),
+            "max_abs_proba_delta": float(np.abs(expected - got).max()),
+        }
+        if args.eval_split != "none":
+            delta.update(split_accuracy_delta(config, args.eval_split, pipeline, forest, feature_columns))
+        meta = load_json(output / MEMMAP_META)
+        meta["accuracy_delta"] = delta
+        save_json(output / MEMMAP_META, meta)
+        print(f"Delta respecto al bosque float64: {delta}")
+    elif not same_labels:
+        sys.exit(1)
+
+    for n in (1, 100, 1000):
+        t_sk = best_time(lambda: pipeline.predict_proba(X_frame.iloc[:n]))
+        t_np = best_time(lambda: forest.predict_proba(X[:n]))
+        print(f"{n:>5} ventanas: sklearn {t_sk * 1e3:8.2f}ms  arrays {t_np * 1e3:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,252 @@
 from __future__ import annotations
 
 import argparse
+import glob
+import json
 import pathlib
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 
 ROOT = pathlib.Path(__file__).resolve().parent
 sys.path.append(str(ROOT / "src"))
 
+import numpy as np
+import pandas as pd
+
 from mhealth.config import load_config
-from mhealth.inference import load_artifacts, predict_windows, prepare_features_from_log
+from mhealth.constants import ACTIVITY_MAP
+from mhealth.inference import (
+    load_artifacts,
+    predict_log_stream,
+    predict_windows,
+    prepare_features_from_log,
+)
+
+OUTPUT_FORMATS = {".parquet": "parquet", ".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+# Per-process artifacts for batch mode, loaded once by _init_worker.
+_WORKER: Dict[str, object] = {}
 
 
 def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Run inference on a single .log file.")
-    parser.add_argument("log_path", help="Path to mHealth .log file.")
+    parser = argparse.ArgumentParser(
+        description="Run inference on a .log file, or on a directory/glob of them."
+    )
+    parser.add_argument(
+        "log_path", help="Path to an mHealth .log file, a directory of .log files or a glob."
+    )
     parser.add_argument("--config", default="config/config.yaml", help="Config YAML.")
     parser.add_argument("--subject-id", type=int, default=0, help="Subject id placeholder.")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read the log in blocks and print predictions as they are ready (constant memory).",
+    )
+    parser.add_argument(
+        "--output",
+        help="Batch mode: per-window results file (.parquet, .csv or .ndjson).",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Batch mode: files scored in parallel."
+    )
+    parser.add_argument(
+        "--model", help="Model artifact to serve (default: artifacts.model_path)."
+    )
     return parser.parse_args()
 
 
+def print_stream(model, feature_cols, log_path: pathlib.Path, config) -> None:
+    for chunk in predict_log_stream(model, log_path, config, feature_cols):
+        labels, counts = np.unique(chunk["predictions"], return_counts=True)
+        main = ACTIVITY_MAP.get(int(labels[np.argmax(counts)]), str(labels[np.argmax(counts)]))
+        print(
+            f"ventanas {chunk['window_index'][0]}-{chunk['window_index'][-1]} "
+            f"({chunk['start_seconds'][0]:.1f}s-{chunk['start_seconds'][-1]:.1f}s): "
+            f"mayoría {main}"
+        )
+
+
+def resolve_logs(pattern: str) -> List[pathlib.Path]:
+    path = pathlib.Path(pattern)
+    if path.is_dir():
+        return sorted(path.glob("*.log"))
+    if path.is_file():
+        return [path]
+    return sorted(pathlib.Path(p) for p in glob.glob(pattern, recursive=True))
+
+
+def _init_worker(config_path: str, model_path: Optional[str]) -> None:
+    config = load_config(config_path)
+    model, feature_cols, _ = load_artifacts(config, model_path=model_path)
+    _WORKER.update(config=config, model=model, feature_cols=feature_cols)
+
+
+def score_file(log_path: pathlib.Path) -> Tuple[pd.DataFrame, Dict[str, object]]:
+    """
+    Per-window predictions of one log (streamed, so memory stays bounded)
+    and its timing; errors are reported in the summary instead of raised.
+    """
+    model, config = _WORKER["model"], _WORKER["config"]
+    start = time.perf_counter()
+    frames = []
+    try:
+        for chunk in predict_log_stream(model, log_path, config, _WORKER["feature_cols"]):
+            frame = pd.DataFrame(
+                {
+                    "file": str(log_path),
+                    "window_index": chunk["window_index"],
+                    "start_seconds": chunk["start_seconds"],
+                    "prediction": chunk["predictions"],
+                    "activity": [ACTIVITY_MAP.get(int(p), str(p)) for p in chunk["predictions"]],
+                    "label": chunk["labels"],
+                }
+            )
+            for k, cls in enumerate(model.classes_):
+                frame[f"proba_{int(cls)}"] = chunk["proba"][:, k]
+            frames.append(frame)
+        error = None
+    except Exception as exc:  # one bad file must not stop the batch
+        error = f"{type(exc).__name__}: {exc}"
+    results = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    seconds = time.perf_counter() - start
+    return results, {
+        "file": str(log_path),
+        "windows": len(results),
+        "seconds": seconds,
+        "windows_per_second": len(results) / seconds if seconds > 0 else None,
+        "error": error,
+    }
+
+
+def score_files(
+    logs: List[pathlib.Path], config_path: str, model_path: Optional[str], workers: int
+) -> Iterator[Tuple[pd.DataFrame, Dict[str, object]]]:
+    """
+    score_file over ``logs`` in input order, on a pool of ``workers``
+    processes that each load the artifacts once.
+    """
+    if workers <= 1:
+        _init_worker(config_path, model_path)
+        yield from map(score_file, logs)
+        return
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(config_path, model_path)
+    ) as executor:
+        yield from executor.map(score_file, logs)
+
+
+class ResultWriter:
+    """
+    Appends per-file result frames to one Parquet, CSV or NDJSON file.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        if path.suffix not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Formato de salida no soportado: {path.suffix} "
+                f"(usar {', '.join(sorted(OUTPUT_FORMATS))})"
+            )
+        self.path = path
+        self.format = OUTPUT_FORMATS[path.suffix]
+        self._parquet = None
+        self._rows = 0
+        if self.format == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as exc:
+                raise ImportError(
+                    "Parquet requiere pyarrow (pip install pyarrow); usar .csv o .ndjson."
+                ) from exc
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.unlink(missing_ok=True)
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if frame.empty:
+            return
+        if self.format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        elif self.format == "csv":
+            frame.to_csv(self.path, mode="a", header=self._rows == 0, index=False)
+        else:
+            with open(self.path, "a", encoding="utf-8") as f:
+                frame.to_json(f, orient="records", lines=True)
+        self._rows += len(frame)
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def run_batch(args: argparse.Namespace) -> None:
+    logs = resolve_logs(args.log_path)
+    if not logs:
+        sys.exit(f"No se encontraron archivos .log en {args.log_path}")
+    config = load_config(args.config)
+    output = pathlib.Path(
+        args.output
+        or config.artifacts.get("batch_predictions", f"{config.artifacts['dir']}/predictions.csv")
+    )
+    try:
+        writer = ResultWriter(output)
+    except (ValueError, ImportError) as exc:
+        sys.exit(str(exc))
+
+    start = time.perf_counter()
+    summary = []
+    try:
+        for results, info in score_files(logs, args.config, args.model, args.workers):
+            writer.write(results)
+            summary.append(info)
+            status = info["error"] or f"{info['windows']} ventanas"
+            print(f"  {info['file']}: {status} ({info['seconds']:.2f}s)")
+    finally:
+        writer.close()
+    seconds = time.perf_counter() - start
+
+    windows = sum(info["windows"] for info in summary)
+    failed = [info for info in summary if info["error"]]
+    totals = {
+        "files": len(summary),
+        "failed": len(failed),
+        "windows": windows,
+        "workers": args.workers,
+        "seconds": seconds,
+        "files_per_second": len(summary) / seconds,
+        "windows_per_second": windows / seconds,
+        "output": str(output),
+    }
+    summary_path = output.with_name(output.stem + "_summary.json")
+    summary_path.write_text(
+        json.dumps({**totals, "per_file": summary}, indent=2), encoding="utf-8"
+    )
+    print(
+        f"\n{totals['files']} archivos ({totals['failed']} con error), {windows} ventanas "
+        f"en {seconds:.2f}s: {totals['files_per_second']:.2f} archivos/s, "
+        f"{totals['windows_per_second']:.0f} ventanas/s"
+    )
+    print(f"Resultados: {output}  Resumen: {summary_path}")
+    if failed:
+        sys.exit(1)
+
+
 def main() -> None:
     args = parse_args()
+    if args.output or not pathlib.Path(args.log_path).is_file():
+        run_batch(args)
+        return
     config = load_config(args.config)
-    model, feature_cols, _ = load_artifacts(config)
+    model, feature_cols, _ = load_artifacts(config, model_path=args.model)
+    if args.stream:
+        print_stream(model, feature_cols, pathlib.Path(args.log_path), config)
+        return
     windows = prepare_features_from_log(pathlib.Path(args.log_path), config, args.subject_id)
     feature_df = windows.drop(columns=["activity", "subject"])
     result = predict_windows(model, feature_df, feature_cols)
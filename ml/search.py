@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parent
+sys.path.append(str(ROOT / "src"))
+
+from mhealth.config import load_config
+from mhealth.data import MHealthDataset, load_dataset
+from mhealth.feature_store import FeatureStore
+from mhealth.modeling import build_windows
+from mhealth.search import successive_halving
+from mhealth.utils import save_json
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Successive-halving search over RF hyperparameters and window settings."
+    )
+    parser.add_argument("--config", default="config/config.yaml", help="Config YAML.")
+    parser.add_argument(
+        "--budget", type=float, default=600.0, help="Wall-clock budget in seconds."
+    )
+    parser.add_argument("--trials", type=int, default=27, help="Configurations sampled.")
+    parser.add_argument("--eta", type=int, default=3, help="Halving rate between rungs.")
+    parser.add_argument("--jobs", type=int, default=1, help="Trials run in parallel.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = load_config(args.config)
+    dataset = MHealthDataset(config)
+
+    if config.features.get("store", False):
+
+        def window_source(variant):
+            return FeatureStore(variant).windows(dataset, dataset.train_subject_ids)
+
+    else:
+        # Parse once; every window setting is built from the same raw frame
+        df = load_dataset(config, exclude_demo=True, dataset=dataset)
+
+        def window_source(variant):
+            return build_windows(df, variant)
+
+    print("=" * 60)
+    print(f"BÚSQUEDA DE HIPERPARÁMETROS ({args.trials} configuraciones, {args.budget:.0f}s)")
+    print("=" * 60)
+    results = successive_halving(
+        config,
+        window_source,
+        budget_seconds=args.budget,
+        n_trials=args.trials,
+        eta=args.eta,
+        n_jobs=args.jobs,
+    )
+
+    path = config.artifacts.get(
+        "search_results", pathlib.Path(config.artifacts["dir"]) / "search_results.json"
+    )
+    save_json(path, results)
+
+    for rung in results["rungs"]:
+        best = rung["trials"][0]
+        print(
+            f"rung fracción={rung['fraction']:.3f}: {len(rung['trials'])} trials, "
+            f"mejor macro_f1={best['macro_f1']:.4f} (trial {best['trial']})"
+        )
+    if results["budget_exhausted"]:
+        print("[INFO] Presupuesto agotado; frontera construida con el último rung alcanzado.")
+
+    print("\nFrontera (macro_f1 / latencia / tamaño):")
+    for c in results["frontier"]:
+        print(
+            f"  trial {c['trial']:>3}: macro_f1={c['macro_f1']:.4f} acc={c['accuracy']:.4f} "
+            f"latencia={c['latency_ms']:.2f}ms ({c['batch_us_per_window']:.1f}us/ventana lote) "
+            f"tamaño={c['model_bytes'] / 2**20:.2f}MB params={c['params']}"
+        )
+    print(f"\nResultados en {path} ({results['elapsed_seconds']:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import pathlib
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional
 
 import yaml
@@ -22,6 +22,18 @@ class ModelConfig:
     class_weight: Optional[str]
 
 
+@dataclass
+class DataConfig:
+    parse_cache: bool = True
+    load_workers: int = 1
+    load_executor: str = "process"
+    compact_dtypes: bool = False
+    max_cached_subjects: int = 4
+    extract_archive: bool = True
+    dataset_url: Optional[str] = None
+    dataset_sha256: Optional[str] = None
+
+
 @dataclass
 class Config:
     version: str
@@ -34,6 +46,11 @@ class Config:
     features: dict
     model: ModelConfig
     artifacts: dict
+    data: DataConfig = field(default_factory=DataConfig)
+    search: dict = field(default_factory=dict)
+    distill: dict = field(default_factory=dict)
+    evaluation: dict = field(default_factory=dict)
+    sizing: dict = field(default_factory=dict)
 
 
 def load_config(path: str | pathlib.Path = "config/config.yaml") -> Config:
@@ -63,4 +80,25 @@ def load_config(path: str | pathlib.Path = "config/config.yaml") -> Config:
             class_weight=raw["model"]["class_weight"],
         ),
         artifacts=raw["artifacts"],
+        data=_load_data_config(raw.get("data") or {}),
+        search=raw.get("search") or {},
+        distill=raw.get("distill") or {},
+        evaluation=raw.get("evaluation") or {},
+        sizing=raw.get("sizing") or {},
+    )
+
+
+def _load_data_config(raw: dict) -> DataConfig:
+    defaults = DataConfig()
+    return DataConfig(
+        parse_cache=bool(raw.get("parse_cache", defaults.parse_cache)),
+        load_workers=int(raw.get("load_workers", defaults.load_workers)),
+        load_executor=str(raw.get("load_executor", defaults.load_executor)),
+        compact_dtypes=bool(raw.get("compact_dtypes", defaults.compact_dtypes)),
+        max_cached_subjects=int(
+            raw.get("max_cached_subjects", defaults.max_cached_subjects)
+        ),
+        extract_archive=bool(raw.get("extract_archive", defaults.extract_archive)),
+        dataset_url=raw.get("dataset_url", defaults.dataset_url),
+        dataset_sha256=raw.get("dataset_sha256", defaults.dataset_sha256),
     )
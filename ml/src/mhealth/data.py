@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import hashlib
+import os
 import pathlib
 import re
 import zipfile
-from typing import Iterable, Tuple
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -15,65 +20,479 @@ from .constants import (
     ALL_COLUMNS,
     DATASET_URL,
     LABEL_COLUMN,
+    PROCESSED_DIR,
     RAW_DIR,
+    SENSOR_COLUMNS,
     SUBJECT_COLUMN,
+    TIMESTAMP_COLUMN,
 )
-from .utils import ensure_dir
+from .parsing import read_log, split_log_columns
+from .profiling import stage
+from .utils import ensure_dir, load_json, save_json
 
+PARSED_CACHE_DIR = PROCESSED_DIR / "logs"
 
-def fetch_dataset(url: str = None) -> pathlib.Path:
+
+DOWNLOAD_CHUNK_BYTES = 1 << 20
+PROGRESS_EVERY_BYTES = 5 << 20
+
+
+def _file_sha256(path: pathlib.Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _report_progress(done: int, total: Optional[int]) -> None:
+    if total:
+        print(
+            f"\r[INFO] Descargando dataset: {done / 1e6:.1f}/{total / 1e6:.1f} MB "
+            f"({100 * done / total:.0f}%)",
+            end="",
+            flush=True,
+        )
+    else:
+        print(f"\r[INFO] Descargando dataset: {done / 1e6:.1f} MB", end="", flush=True)
+
+
+def _download_to(url: str, part_path: pathlib.Path, timeout: int = 60) -> None:
+    """
+    Stream ``url`` into ``part_path``, resuming after an interrupted download
+    with an HTTP Range request when the server supports it.
+    """
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with requests.get(url, headers=headers, stream=True, timeout=timeout) as resp:
+        if offset and resp.status_code == 416:
+            # Range starts past the end: done if the partial file has exactly
+            # the server's size, otherwise it is stale, so start over.
+            size = resp.headers.get("Content-Range", "").rpartition("/")[2]
+            if size.isdigit() and int(size) == offset:
+                return
+            part_path.unlink()
+            return _download_to(url, part_path, timeout)
+        resp.raise_for_status()
+        if offset and resp.status_code != 206:
+            offset = 0  # Range ignored: start over.
+        length = resp.headers.get("Content-Length")
+        total = offset + int(length) if length is not None else None
+        done = reported = offset
+        with open(part_path, "ab" if offset else "wb") as f:
+            for chunk in resp.iter_content(DOWNLOAD_CHUNK_BYTES):
+                f.write(chunk)
+                done += len(chunk)
+                if done - reported >= PROGRESS_EVERY_BYTES:
+                    _report_progress(done, total)
+                    reported = done
+    _report_progress(done, total)
+    print()
+    if total is not None and done != total:
+        raise IOError(
+            f"Descarga incompleta ({done} de {total} bytes); vuelva a ejecutar para reanudar."
+        )
+
+
+def _copy_to(source: pathlib.Path, part_path: pathlib.Path) -> None:
+    with open(source, "rb") as src, open(part_path, "wb") as dst:
+        for chunk in iter(lambda: src.read(DOWNLOAD_CHUNK_BYTES), b""):
+            dst.write(chunk)
+
+
+def fetch_dataset(url: str = None, sha256: Optional[str] = None) -> pathlib.Path:
     """
     Download dataset zip to RAW_DIR if not present.
+
+    ``url`` may be an HTTP(S) URL, a ``file://`` URL or a local path (e.g. a
+    mirror). The archive is streamed to a ``.part`` file, resumed if a previous
+    download was interrupted, checked against ``sha256`` when given and against
+    the zip format, and only then renamed into place.
     """
     ensure_dir(RAW_DIR)
     zip_path = RAW_DIR / "mhealth_dataset.zip"
     if zip_path.exists():
         return zip_path
     dataset_url = url or DATASET_URL
-    resp = requests.get(dataset_url, timeout=60)
-    resp.raise_for_status()
-    zip_path.write_bytes(resp.content)
+    part_path = zip_path.with_name(zip_path.name + ".part")
+
+    if dataset_url.startswith(("http://", "https://")):
+        _download_to(dataset_url, part_path)
+    else:
+        local = pathlib.Path(dataset_url.removeprefix("file://"))
+        print(f"[INFO] Copiando dataset desde {local}")
+        _copy_to(local, part_path)
+
+    if sha256 is not None:
+        actual = _file_sha256(part_path)
+        if actual != sha256.lower():
+            part_path.unlink()
+            raise ValueError(
+                f"SHA-256 del dataset no coincide: esperado {sha256}, obtenido {actual}"
+            )
+    if not zipfile.is_zipfile(part_path):
+        part_path.unlink()
+        raise ValueError(f"El archivo descargado de {dataset_url} no es un zip válido.")
+    os.replace(part_path, zip_path)
     return zip_path
 
 
+def _fetch_configured_dataset(config: Config) -> pathlib.Path:
+    return fetch_dataset(config.data.dataset_url, config.data.dataset_sha256)
+
+
+def _extracted_root() -> Optional[pathlib.Path]:
+    # The archive unpacks to MHEALTHDATASET/ (nested in some mirrors).
+    possible = sorted(RAW_DIR.glob("**/mHealth_subject1.log"))
+    return possible[0].parent if possible else None
+
+
 def extract_dataset(zip_path: pathlib.Path) -> pathlib.Path:
-    target_dir = RAW_DIR / "mhealth_dataset"
-    if target_dir.exists():
-        return target_dir
+    """
+    Directory holding the subject logs, unzipping only if no previous
+    extraction exists; re-extracting would reset every log's mtime and force
+    the parse cache to re-hash them.
+    """
+    existing = _extracted_root()
+    if existing is not None:
+        return existing
     with zipfile.ZipFile(zip_path, "r") as zf:
         zf.extractall(RAW_DIR)
-    # Some zips nest the folder; try to find the extracted root.
-    possible = list(RAW_DIR.glob("**/mHealth_subject1.log"))
-    if possible:
-        target_dir = possible[0].parent
-    return target_dir
+    return _extracted_root() or RAW_DIR / "mhealth_dataset"
 
 
 def iter_subject_files(dataset_dir: pathlib.Path) -> Iterable[Tuple[int, pathlib.Path]]:
-    for path in sorted(dataset_dir.glob("mHealth_subject*.log")):
+    """
+    Yield (subject_id, path) pairs ordered by subject id.
+    """
+    found = []
+    for path in dataset_dir.glob("mHealth_subject*.log"):
         match = re.search(r"subject(\d+)", path.name)
         if not match:
             continue
-        yield int(match.group(1)), path
+        found.append((int(match.group(1)), path))
+    yield from sorted(found)
+
+
+@dataclass(frozen=True)
+class ZipMember:
+    """
+    A subject log read straight from the dataset archive, without extracting.
+    """
+
+    archive: pathlib.Path
+    name: str
+
+    @property
+    def stem(self) -> str:
+        return pathlib.PurePosixPath(self.name).stem
+
+    def info(self) -> zipfile.ZipInfo:
+        with zipfile.ZipFile(self.archive) as zf:
+            return zf.getinfo(self.name)
+
+    def __str__(self) -> str:
+        return f"{self.archive}!{self.name}"
+
+
+SubjectSource = Union[pathlib.Path, ZipMember]
+
+
+def iter_archive_subjects(zip_path: pathlib.Path) -> Iterable[Tuple[int, ZipMember]]:
+    """
+    Yield (subject_id, member) pairs for the subject logs inside the archive,
+    ordered by subject id.
+    """
+    found = []
+    with zipfile.ZipFile(zip_path) as zf:
+        for name in zf.namelist():
+            match = re.fullmatch(r"mHealth_subject(\d+)\.log", pathlib.PurePosixPath(name).name)
+            if match:
+                found.append((int(match.group(1)), ZipMember(zip_path, name)))
+    yield from sorted(found, key=lambda item: item[0])
+
+
+def _source_version(source: SubjectSource) -> Tuple[int, object]:
+    """
+    Cheap (size, modification marker) of a subject log.
+    """
+    if isinstance(source, ZipMember):
+        info = source.info()
+        return info.file_size, list(info.date_time)
+    stat = source.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _source_digest(source: SubjectSource) -> str:
+    """
+    Content hash of a subject log: SHA-256 for files, the stored CRC-32 for
+    archive members (already in the zip directory, so free to read).
+    """
+    if isinstance(source, ZipMember):
+        return f"crc32:{source.info().CRC:08x}"
+    return f"sha256:{_file_sha256(source)}"
+
+
+def _recorded_digest(source: SubjectSource, cache_dir: Optional[pathlib.Path]) -> Optional[str]:
+    """
+    Digest stored in the parse cache, if the cache entry is still current.
+    """
+    if cache_dir is None:
+        return None
+    meta_path = cache_dir / f"{_cache_name(source)}.json"
+    if not meta_path.exists():
+        return None
+    meta = load_json(meta_path)
+    size, modified = _source_version(source)
+    if meta.get("size") != size or meta.get("modified") != modified:
+        return None
+    return meta.get("digest")
+
+
+def _cache_name(source: SubjectSource) -> str:
+    if isinstance(source, ZipMember):
+        return f"{source.archive.stem}-{source.stem}"
+    return source.stem
+
+
+def _read_parsed_cache(
+    source: SubjectSource, cache_dir: pathlib.Path
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Return cached (sensors, activity) arrays for ``source`` if still valid.
+
+    Size and modification time are checked first; when only the time changed
+    the content hash decides, so touched-but-identical files stay cached.
+    """
+    name = _cache_name(source)
+    meta_path = cache_dir / f"{name}.json"
+    data_path = cache_dir / f"{name}.npz"
+    if not meta_path.exists() or not data_path.exists():
+        return None
+    meta = load_json(meta_path)
+    size, modified = _source_version(source)
+    if meta.get("size") != size:
+        return None
+    if meta.get("modified") != modified:
+        if meta.get("digest") != _source_digest(source):
+            return None
+        meta["modified"] = modified
+        save_json(meta_path, meta)
+    with np.load(data_path) as cached:
+        return cached["sensors"], cached["activity"]
+
+
+def _write_parsed_cache(
+    source: SubjectSource,
+    cache_dir: pathlib.Path,
+    sensors: np.ndarray,
+    activity: np.ndarray,
+) -> None:
+    ensure_dir(cache_dir)
+    name = _cache_name(source)
+    size, modified = _source_version(source)
+    data_path = cache_dir / f"{name}.npz"
+    tmp_path = cache_dir / f"{name}.tmp.npz"
+    np.savez(tmp_path, sensors=sensors, activity=activity)
+    os.replace(tmp_path, data_path)
+    save_json(
+        cache_dir / f"{name}.json",
+        {
+            "source": str(source),
+            "size": size,
+            "modified": modified,
+            "digest": _source_digest(source),
+        },
+    )
+
+
+def _parse_subject_log(source: SubjectSource) -> Tuple[np.ndarray, np.ndarray]:
+    if isinstance(source, ZipMember):
+        # Stream-decompress the member straight into the parser.
+        with zipfile.ZipFile(source.archive) as zf:
+            with zf.open(source.name) as f:
+                values = read_log(f, columns=[len(ALL_COLUMNS)])
+    else:
+        values = read_log(source, columns=[len(ALL_COLUMNS)])
+    sensors, activity = split_log_columns(values)
+    return np.ascontiguousarray(sensors), activity
 
 
 def load_subject_log(
-    path: pathlib.Path, subject_id: int, sample_rate_hz: int
+    path: SubjectSource,
+    subject_id: int,
+    sample_rate_hz: int,
+    cache_dir: Optional[pathlib.Path] = PARSED_CACHE_DIR,
+    compact: bool = False,
 ) -> pd.DataFrame:
-    df = pd.read_csv(
-        path,
-        sep=r"\s+",
-        header=None,
-        names=ALL_COLUMNS,
-    )
+    """
+    Parse one subject log (a file or a ZipMember of the dataset archive),
+    reusing the binary copy under ``cache_dir`` while the source is unchanged.
+    Pass ``cache_dir=None`` to always re-parse.
+
+    With ``compact=True`` sensors are float32, activity int8 and subject int16,
+    and no timestamp column is stored: rows are kept in recording order, so a
+    sample's time is its position within the subject divided by the rate.
+    """
+    cached = _read_parsed_cache(path, cache_dir) if cache_dir is not None else None
+    if cached is None:
+        sensors, activity = _parse_subject_log(path)
+        if cache_dir is not None:
+            _write_parsed_cache(path, cache_dir, sensors, activity)
+    else:
+        sensors, activity = cached
+
+    if compact:
+        df = pd.DataFrame(sensors.astype(np.float32), columns=SENSOR_COLUMNS)
+        df[LABEL_COLUMN] = activity.astype(np.int8)
+        df[SUBJECT_COLUMN] = np.full(len(df), subject_id, dtype=np.int16)
+        return df
+
+    df = pd.DataFrame(sensors, columns=SENSOR_COLUMNS)
+    df[LABEL_COLUMN] = activity
     # Add synthetic timestamp based on sample rate to keep ordering.
-    df["timestamp"] = np.arange(len(df)) / float(sample_rate_hz)
+    df[TIMESTAMP_COLUMN] = np.arange(len(df)) / float(sample_rate_hz)
     df[SUBJECT_COLUMN] = subject_id
-    df[LABEL_COLUMN] = df[LABEL_COLUMN].astype(int)
     return df
 
 
-def load_dataset(config: Config, exclude_demo: bool = True) -> pd.DataFrame:
+def _parsed_cache_dir(config: Config) -> Optional[pathlib.Path]:
+    return PARSED_CACHE_DIR if config.data.parse_cache else None
+
+
+def _load_subjects(
+    config: Config, subjects: List[Tuple[int, SubjectSource]]
+) -> List[pd.DataFrame]:
+    """
+    Parse subject logs, concurrently when ``data.load_workers`` > 1.
+    Frames are returned in the order of ``subjects`` either way.
+    """
+    args = [
+        (
+            path,
+            subject_id,
+            config.sample_rate_hz,
+            _parsed_cache_dir(config),
+            config.data.compact_dtypes,
+        )
+        for subject_id, path in subjects
+    ]
+    workers = min(config.data.load_workers, len(args))
+    if workers <= 1:
+        return [load_subject_log(*a) for a in args]
+
+    executor_cls = (
+        ThreadPoolExecutor if config.data.load_executor == "thread" else ProcessPoolExecutor
+    )
+    with executor_cls(max_workers=workers) as executor:
+        return list(executor.map(load_subject_log, *zip(*args)))
+
+
+class MHealthDataset:
+    """
+    Subject-indexed view of the MHEALTH logs.
+
+    Subject files are located once; each subject is parsed on first access and
+    kept in an LRU of at most ``data.max_cached_subjects`` frames, so tools that
+    touch a single subject only parse that file. With ``data.extract_archive``
+    disabled the logs are read directly from the downloaded zip.
+    """
+
+    def __init__(
+        self, config: Config, dataset_dir: Optional[pathlib.Path] = None
+    ) -> None:
+        self.config = config
+        self.files: Dict[int, SubjectSource]
+        if dataset_dir is not None:
+            self.files = dict(iter_subject_files(dataset_dir))
+        elif config.data.extract_archive:
+            zip_path = _fetch_configured_dataset(config)
+            self.files = dict(iter_subject_files(extract_dataset(zip_path)))
+        else:
+            self.files = dict(iter_archive_subjects(_fetch_configured_dataset(config)))
+        self._cache: "OrderedDict[int, pd.DataFrame]" = OrderedDict()
+
+    def __contains__(self, subject_id: object) -> bool:
+        return subject_id in self.files
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    @property
+    def subject_ids(self) -> List[int]:
+        return sorted(self.files)
+
+    @property
+    def demo_subject_ids(self) -> List[int]:
+        demo = set(self.config.excluded_subjects_demo)
+        return [s for s in self.subject_ids if s in demo]
+
+    @property
+    def train_subject_ids(self) -> List[int]:
+        demo = set(self.config.excluded_subjects_demo)
+        return [s for s in self.subject_ids if s not in demo]
+
+    def fingerprint(self, subject_id: int) -> str:
+        """
+        Content hash of a subject's source log (taken from the parse cache
+        when its entry is current, so unchanged files are not re-hashed).
+        """
+        source = self.files[subject_id]
+        recorded = _recorded_digest(source, _parsed_cache_dir(self.config))
+        return recorded or _source_digest(source)
+
+    def _remember(self, subject_id: int, frame: pd.DataFrame) -> None:
+        self._cache[subject_id] = frame
+        self._cache.move_to_end(subject_id)
+        while len(self._cache) > max(0, self.config.data.max_cached_subjects):
+            self._cache.popitem(last=False)
+
+    def subject(self, subject_id: int) -> pd.DataFrame:
+        """
+        Raw frame of one subject, parsed on first access.
+        """
+        return self.subjects([subject_id])
+
+    def subjects(self, subject_ids: Sequence[int]) -> pd.DataFrame:
+        """
+        Raw frames of the given subjects concatenated in subject order.
+        """
+        ids = sorted(set(subject_ids))
+        unknown = [s for s in ids if s not in self.files]
+        if unknown:
+            raise KeyError(f"Sujetos no encontrados en el dataset: {unknown}")
+        if not ids:
+            return pd.DataFrame()
+
+        frames: Dict[int, pd.DataFrame] = {}
+        for subject_id in ids:
+            if subject_id in self._cache:
+                self._cache.move_to_end(subject_id)
+                frames[subject_id] = self._cache[subject_id]
+        missing = [s for s in ids if s not in frames]
+        with stage("load_subjects", subjects=len(ids), parsed=len(missing)) as info:
+            loaded = _load_subjects(self.config, [(s, self.files[s]) for s in missing])
+            for subject_id, frame in zip(missing, loaded):
+                frames[subject_id] = frame
+                self._remember(subject_id, frame)
+            info["rows"] = int(sum(len(frames[s]) for s in ids))
+
+        if len(ids) == 1:
+            return frames[ids[0]].copy()
+        return pd.concat([frames[s] for s in ids], ignore_index=True)
+
+    def train_subjects(self) -> pd.DataFrame:
+        return self.subjects(self.train_subject_ids)
+
+    def demo_subjects(self) -> pd.DataFrame:
+        return self.subjects(self.demo_subject_ids)
+
+
+def load_dataset(
+    config: Config,
+    exclude_demo: bool = True,
+    dataset: Optional[MHealthDataset] = None,
+) -> pd.DataFrame:
     """
     Load MHealth dataset.
 
@@ -81,46 +500,30 @@ def load_dataset(config: Config, exclude_demo: bool = True) -> pd.DataFrame:
         config: Configuration object
         exclude_demo: If True, completely excludes demo subjects (9, 10) from loading.
                      This prevents any possibility of data leakage.
+        dataset: Optional already-indexed dataset to load from.
     """
-    zip_path = fetch_dataset()
-    dataset_dir = extract_dataset(zip_path)
-    frames = []
-    excluded_subjects = set(config.excluded_subjects_demo) if exclude_demo else set()
+    dataset = dataset or MHealthDataset(config)
+    if not exclude_demo:
+        return dataset.subjects(dataset.subject_ids)
 
-    for subject_id, path in iter_subject_files(dataset_dir):
-        if subject_id in excluded_subjects:
-            print(
-                f"[INFO] Excluyendo sujeto {subject_id} del dataset de entrenamiento (demo)"
-            )
-            continue
-        frames.append(load_subject_log(path, subject_id, config.sample_rate_hz))
-
-    data = pd.concat(frames, ignore_index=True)
-    data[LABEL_COLUMN] = data[LABEL_COLUMN].map(lambda x: int(x))
-    return data
+    for subject_id in dataset.demo_subject_ids:
+        print(
+            f"[INFO] Excluyendo sujeto {subject_id} del dataset de entrenamiento (demo)"
+        )
+    return dataset.train_subjects()
 
 
-def load_demo_subjects(config: Config) -> pd.DataFrame:
+def load_demo_subjects(
+    config: Config, dataset: Optional[MHealthDataset] = None
+) -> pd.DataFrame:
     """
     Load ONLY the demo subjects (9, 10) for evaluation purposes.
     These subjects are never used in training.
     """
-    zip_path = fetch_dataset()
-    dataset_dir = extract_dataset(zip_path)
-    frames = []
-    demo_subjects = set(config.excluded_subjects_demo)
-
-    for subject_id, path in iter_subject_files(dataset_dir):
-        if subject_id in demo_subjects:
-            print(f"[INFO] Cargando sujeto demo {subject_id} para evaluación")
-            frames.append(load_subject_log(path, subject_id, config.sample_rate_hz))
-
-    if not frames:
-        return pd.DataFrame()
-
-    data = pd.concat(frames, ignore_index=True)
-    data[LABEL_COLUMN] = data[LABEL_COLUMN].map(lambda x: int(x))
-    return data
+    dataset = dataset or MHealthDataset(config)
+    for subject_id in dataset.demo_subject_ids:
+        print(f"[INFO] Cargando sujeto demo {subject_id} para evaluación")
+    return dataset.demo_subjects()
 
 
 def activity_name(label: int) -> str:
@@ -0,0 +1,131 @@
+"""
+Persistent per-subject window feature store.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .config import Config
+from .constants import LABEL_COLUMN, PROCESSED_DIR, SENSOR_COLUMNS, SUBJECT_COLUMN
+from .data import MHealthDataset
+from .preprocess import DEFAULT_STATS, create_windows, feature_names, subject_rows
+from .profiling import stage
+from .utils import ensure_dir
+
+FEATURE_STORE_DIR = PROCESSED_DIR / "features"
+
+# Bump when the windowing/feature code changes in a way that alters values.
+STORE_FORMAT = 1
+
+
+class FeatureStore:
+    """
+    Window feature matrix and labels of each subject, persisted under
+    ``PROCESSED_DIR/features``.
+
+    A block is keyed by the subject, the content fingerprint of its source log
+    and every setting that changes the windows (window/overlap seconds, sample
+    rate, feature stats and engine, and the parsed dtypes). Blocks for other settings are kept, so
+    switching back and forth between configurations stays cached.
+    """
+
+    def __init__(self, config: Config, root: pathlib.Path = FEATURE_STORE_DIR):
+        self.config = config
+        self.root = root
+        self.stats = list(config.features.get("stats") or DEFAULT_STATS)
+        self.columns = feature_names(SENSOR_COLUMNS, self.stats)
+
+    def _key(self, subject_id: int, fingerprint: str) -> str:
+        key = {
+            "format": STORE_FORMAT,
+            "subject": subject_id,
+            "source": fingerprint,
+            "window_seconds": self.config.window_seconds,
+            "window_overlap_seconds": self.config.window_overlap_seconds,
+            "sample_rate_hz": self.config.sample_rate_hz,
+            "stats": self.stats,
+            "engine": self.config.features.get("engine", "batched"),
+            # float32 sensors shift the features by ~1e-6.
+            "compact_dtypes": self.config.data.compact_dtypes,
+            "drop_unlabeled": True,
+        }
+        payload = json.dumps(key, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()[:20]
+
+    def _path(self, subject_id: int, fingerprint: str) -> pathlib.Path:
+        return self.root / f"subject{subject_id}-{self._key(subject_id, fingerprint)}.npz"
+
+    def _load(self, path: pathlib.Path, subject_id: int) -> pd.DataFrame:
+        with np.load(path) as block:
+            features, labels = block["features"], block["labels"]
+        result = pd.DataFrame(features, columns=self.columns)
+        result[LABEL_COLUMN] = labels
+        result[SUBJECT_COLUMN] = np.full(len(labels), subject_id)
+        return result
+
+    def _save(self, path: pathlib.Path, windows: pd.DataFrame) -> None:
+        ensure_dir(self.root)
+        tmp_path = path.with_name(path.stem + ".tmp.npz")
+        np.savez(
+            tmp_path,
+            features=windows[self.columns].to_numpy(dtype=np.float64),
+            labels=windows[LABEL_COLUMN].to_numpy(dtype=int),
+        )
+        os.replace(tmp_path, path)
+
+    def _compute(self, dataset: MHealthDataset, subject_ids: List[int]) -> pd.DataFrame:
+        # Same preprocessing as training: unlabeled activity is dropped first.
+        raw = dataset.subjects(subject_ids)
+        return create_windows(
+            raw,
+            self.config.window_seconds,
+            self.config.window_overlap_seconds,
+            self.config.sample_rate_hz,
+            feature_stats=self.stats,
+            engine=self.config.features.get("engine", "batched"),
+            workers=int(self.config.features.get("workers", 1)),
+            rows=subject_rows(raw, drop_unlabeled=True),
+        )
+
+    def subject_windows(self, dataset: MHealthDataset, subject_id: int) -> pd.DataFrame:
+        """
+        Windows of one subject, computed and persisted on the first request.
+        """
+        return self.windows(dataset, [subject_id])
+
+    def windows(
+        self, dataset: MHealthDataset, subject_ids: Sequence[int]
+    ) -> pd.DataFrame:
+        """
+        Windows of several subjects, concatenated in subject order. Subjects
+        missing from the store are windowed together in one create_windows
+        call (parallel with ``features.workers``) and persisted.
+        """
+        subject_ids = sorted(set(subject_ids))
+        paths = {s: self._path(s, dataset.fingerprint(s)) for s in subject_ids}
+        missing = [s for s in subject_ids if not paths[s].exists()]
+
+        with stage("feature_store", subjects=len(subject_ids), computed=len(missing)) as info:
+            computed: Dict[int, pd.DataFrame] = {}
+            if missing:
+                fresh = self._compute(dataset, missing)
+                for subject_id in missing:
+                    block = fresh[fresh[SUBJECT_COLUMN] == subject_id].reset_index(drop=True)
+                    self._save(paths[subject_id], block)
+                    computed[subject_id] = block
+
+            blocks = [
+                computed[s] if s in computed else self._load(paths[s], s) for s in subject_ids
+            ]
+            if not blocks:
+                return pd.DataFrame(columns=self.columns + [LABEL_COLUMN, SUBJECT_COLUMN])
+            windows = pd.concat(blocks, ignore_index=True)
+            info["windows"] = len(windows)
+        return windows
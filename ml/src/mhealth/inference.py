@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import pathlib
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 import joblib
 import numpy as np
@@ -9,12 +9,342 @@ import pandas as pd
 
 from .config import Config
 from .constants import ACTIVITY_MAP, LABEL_COLUMN, SENSOR_COLUMNS, SUBJECT_COLUMN
-from .preprocess import create_windows, filter_unlabeled_activity
-from .utils import load_json
+from .parsing import CHUNK_BYTES, iter_log_blocks, read_log, split_log_columns
+from .preprocess import (
+    DEFAULT_STATS,
+    create_windows,
+    feature_names,
+    filter_unlabeled_activity,
+    window_features,
+)
+from .utils import load_json, save_json
 
 
-def load_artifacts(config: Config):
-    model = joblib.load(config.artifacts["model_path"])
+# Windows evaluated per ArrayForest pass; bounds the (windows x trees) buffers.
+ARRAY_BATCH = 4096
+
+# Probability encodings of predict_windows_columnar.
+PROBA_ENCODINGS = ("float", "float16", "uint8")
+
+MEMMAP_META = "meta.json"
+MEMMAP_FORMAT = "mhealth-forest-memmap/1"
+
+
+def _flatten_forest(pipeline) -> Dict[str, np.ndarray]:
+    scaler = pipeline.named_steps["scaler"]
+    forest = pipeline.named_steps["clf"]
+    trees = [estimator.tree_ for estimator in forest.estimators_]
+
+    counts = np.array([tree.node_count for tree in trees], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    n_classes = len(forest.classes_)
+    feature, threshold, left, right, value = [], [], [], [], []
+    for tree in trees:
+        local = np.arange(tree.node_count)
+        leaf = tree.children_left == -1
+        feature.append(np.where(leaf, 0, tree.feature))
+        threshold.append(np.where(leaf, 0.0, tree.threshold))
+        left.append(np.where(leaf, local, tree.children_left))
+        right.append(np.where(leaf, local, tree.children_right))
+        proba = tree.value[:, 0, :n_classes].copy()
+        normalizer = proba.sum(axis=1)[:, None]
+        # sklearn >= 1.4 already stores fractions and returns them unchanged;
+        # older versions store weighted counts and normalize at predict time.
+        if not np.allclose(normalizer[normalizer > 0.0], 1.0):
+            normalizer[normalizer == 0.0] = 1.0
+            proba /= normalizer
+        value.append(proba)
+
+    return {
+        "mean": scaler.mean_,
+        "scale": scaler.scale_,
+        "classes": forest.classes_,
+        "offsets": offsets,
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "left": np.concatenate(left).astype(np.int32),
+        "right": np.concatenate(right).astype(np.int32),
+        "value": np.concatenate(value),
+        "max_depth": np.int64(max(estimator.get_depth() for estimator in forest.estimators_)),
+    }
+
+
+def export_forest(
+    pipeline, path: str | pathlib.Path, feature_columns: Optional[List[str]] = None
+) -> pathlib.Path:
+    """
+    Flatten a fitted StandardScaler + RandomForestClassifier pipeline into one
+    ``.npz`` of contiguous arrays (see ArrayForest).
+
+    Nodes of all trees are stored back to back; ``offsets`` marks where each
+    tree starts and child indices are local to their tree. Leaves point to
+    themselves, so a fixed number of descent steps lands every window on a
+    leaf. Leaf class distributions are the ones sklearn's
+    DecisionTreeClassifier.predict_proba returns.
+    """
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(
+        path,
+        **_flatten_forest(pipeline),
+        feature_columns=np.array(feature_columns or [], dtype=str),
+    )
+    return path
+
+
+def _global_children(
+    offsets: np.ndarray, left: np.ndarray, right: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tree-local child indices -> (children, is_leaf) over the concatenated
+    nodes; ``children[2 * node + went_left]`` is the next node.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    counts = np.diff(np.append(offsets, len(left)))
+    base = np.repeat(offsets, counts)
+    left = np.asarray(left, dtype=np.int64) + base
+    right = np.asarray(right, dtype=np.int64) + base
+    is_leaf = left == np.arange(len(left))
+    return np.stack([right, left], axis=1).ravel(), is_leaf
+
+
+def _index_dtype(max_value: int) -> np.dtype:
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+def _round_down_float32(threshold: np.ndarray) -> np.ndarray:
+    """
+    Largest float32 not above each float64 threshold. Inputs are compared as
+    float32, and for a float32 ``x``, ``x <= t`` holds exactly when
+    ``x <= round_down(t)``, so the narrower thresholds route every window
+    the same way.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    narrow = threshold.astype(np.float32)
+    above = narrow.astype(np.float64) > threshold
+    narrow[above] = np.nextafter(narrow[above], np.float32(-np.inf))
+    return narrow
+
+
+def export_forest_memmap(
+    pipeline,
+    directory: str | pathlib.Path,
+    feature_columns: Optional[List[str]] = None,
+    leaf_bits: Optional[int] = None,
+) -> pathlib.Path:
+    """
+    Write the forest as a directory of ``.npy`` files plus ``meta.json``,
+    loaded with ``np.load(mmap_mode="r")`` so worker processes share the
+    pages instead of each holding a copy.
+
+    Thresholds are float32 rounded down (lossless, see _round_down_float32),
+    child indices are global and, like the split features, stored in the
+    smallest unsigned width that fits. ``leaf_bits`` (8 or 16) quantizes the
+    leaf class distributions to ``round(p * (2**bits - 1))``; this is the only
+    lossy step, so its effect on predictions is what ``accuracy_delta`` in
+    the metadata measures.
+    """
+    if leaf_bits not in (None, 8, 16):
+        raise ValueError(f"leaf_bits must be 8, 16 or None, got {leaf_bits}")
+    flat = _flatten_forest(pipeline)
+    children, is_leaf = _global_children(flat["offsets"], flat["left"], flat["right"])
+    n_nodes = len(is_leaf)
+
+    value = flat["value"]
+    value_scale = 1.0
+    if leaf_bits:
+        value_scale = float(2**leaf_bits - 1)
+        value = np.rint(value * value_scale).astype(np.uint8 if leaf_bits == 8 else np.uint16)
+
+    arrays = {
+        "mean": flat["mean"].astype(np.float64),
+        "scale": flat["scale"].astype(np.float64),
+        "classes": flat["classes"],
+        "roots": flat["offsets"].astype(_index_dtype(n_nodes)),
+        "feature": flat["feature"].astype(_index_dtype(len(flat["mean"]) - 1)),
+        "threshold": _round_down_float32(flat["threshold"]),
+        "children": children.astype(_index_dtype(n_nodes - 1)),
+        "is_leaf": is_leaf,
+        "value": value,
+    }
+    directory = pathlib.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(directory / f"{name}.npy", np.ascontiguousarray(array))
+    # meta.json is written last: its presence marks a complete export.
+    save_json(
+        directory / MEMMAP_META,
+        {
+            "format": MEMMAP_FORMAT,
+            "n_trees": int(len(flat["offsets"])),
+            "n_nodes": int(n_nodes),
+            "max_depth": int(flat["max_depth"]),
+            "leaf_bits": leaf_bits,
+            "value_scale": value_scale,
+            "dtypes": {name: str(array.dtype) for name, array in arrays.items()},
+            "feature_columns": list(feature_columns or []),
+        },
+    )
+    return directory
+
+
+def is_memmap_export(path: str | pathlib.Path) -> bool:
+    path = pathlib.Path(path)
+    return path.is_dir() and (path / MEMMAP_META).exists()
+
+
+class ArrayForest:
+    """
+    Vectorized evaluator for forests exported by export_forest or
+    export_forest_memmap; needs only NumPy at serve time.
+
+    Every tree is descended for a whole batch of windows at once. Inputs are
+    scaled in float64 and cast to float32 before the threshold comparisons,
+    and tree probabilities are summed in tree order, which mirrors sklearn
+    and gives identical predictions for unquantized leaves. Quantized leaves
+    are summed as integers and scaled once at the end.
+    """
+
+    def __init__(
+        self,
+        mean: np.ndarray,
+        scale: np.ndarray,
+        classes: np.ndarray,
+        roots: np.ndarray,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        is_leaf: np.ndarray,
+        value: np.ndarray,
+        max_depth: int,
+        value_scale: float = 1.0,
+        feature_columns: Sequence[str] = (),
+    ):
+        # Node arrays are used as given (possibly read-only memmaps).
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.is_leaf = is_leaf
+        self.value = value
+        self.value_scale = float(value_scale)
+        self.max_depth = int(max_depth)
+        self.feature_columns = [str(c) for c in feature_columns]
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "ArrayForest":
+        """
+        Build from the arrays written by export_forest.
+        """
+        children, is_leaf = _global_children(arrays["offsets"], arrays["left"], arrays["right"])
+        return cls(
+            mean=arrays["mean"],
+            scale=arrays["scale"],
+            classes=arrays["classes"],
+            roots=arrays["offsets"],
+            feature=np.asarray(arrays["feature"], dtype=np.intp),
+            threshold=_round_down_float32(arrays["threshold"]),
+            children=children.astype(np.intp),
+            is_leaf=is_leaf,
+            value=np.asarray(arrays["value"], dtype=np.float64),
+            max_depth=int(arrays["max_depth"]),
+            feature_columns=arrays.get("feature_columns", []),
+        )
+
+    @classmethod
+    def load(cls, path: str | pathlib.Path) -> "ArrayForest":
+        """
+        Load a memmap export directory or an ``.npz`` export.
+        """
+        path = pathlib.Path(path)
+        if is_memmap_export(path):
+            meta = load_json(path / MEMMAP_META)
+            if meta.get("format") != MEMMAP_FORMAT:
+                raise ValueError(f"Unsupported forest export format in {path}: {meta.get('format')}")
+            arrays = {
+                name: np.load(path / f"{name}.npy", mmap_mode="r") for name in meta["dtypes"]
+            }
+            return cls(
+                **arrays,
+                max_depth=meta["max_depth"],
+                value_scale=meta["value_scale"],
+                feature_columns=meta["feature_columns"],
+            )
+        with np.load(path) as arrays:
+            return cls.from_arrays({key: arrays[key] for key in arrays.files})
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """
+        Leaf node reached in every tree: (windows x trees) global indices.
+
+        All (window, tree) pairs descend together; pairs drop out of the
+        active set as soon as they reach a leaf, so each step only touches
+        paths that are still going down.
+        """
+        n_windows, n_features = X.shape
+        scaled = ((X - self.mean) / self.scale).astype(np.float32).ravel()
+        nodes = np.tile(self.roots, n_windows)
+        row_base = np.repeat(np.arange(n_windows) * n_features, self.n_trees)
+        active = np.flatnonzero(~self.is_leaf[nodes])
+        while active.size:
+            current = nodes[active]
+            go_left = (
+                scaled[row_base[active] + self.feature[current]] <= self.threshold[current]
+            )
+            current = self.children[2 * current + go_left].astype(np.intp, copy=False)
+            nodes[active] = current
+            active = active[~self.is_leaf[current]]
+        return nodes.reshape(n_windows, self.n_trees)
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        quantized = self.value.dtype.kind != "f"
+        totals = np.zeros(
+            (len(X), len(self.classes_)), dtype=np.int64 if quantized else np.float64
+        )
+        for start in range(0, len(X), ARRAY_BATCH):
+            leaves = self._leaves(X[start : start + ARRAY_BATCH])
+            batch = totals[start : start + ARRAY_BATCH]
+            for tree in range(self.n_trees):
+                batch += self.value[leaves[:, tree]]
+        if quantized:
+            return totals / (self.value_scale * self.n_trees)
+        totals /= self.n_trees
+        return totals
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def load_model(path: str | pathlib.Path):
+    """
+    Load a served model, detecting the format: memmap export directories
+    and ``.npz`` exports become an ArrayForest, anything else is unpickled
+    with joblib.
+    """
+    path = pathlib.Path(path)
+    if path.suffix == ".npz" or is_memmap_export(path):
+        return ArrayForest.load(path)
+    return joblib.load(path)
+
+
+def load_artifacts(config: Config, model_path: Optional[str | pathlib.Path] = None):
+    """
+    Load (model, feature_columns, model_info). ``model_path`` overrides
+    ``artifacts.model_path``, e.g. to serve the distilled student or an
+    exported ArrayForest instead.
+    """
+    model = load_model(model_path or config.artifacts["model_path"])
     feature_meta = load_json(config.artifacts["feature_metadata"])
     feature_columns = feature_meta["feature_columns"]
     model_info = load_json(config.artifacts["model_info"])
@@ -24,23 +354,12 @@ def load_artifacts(config: Config):
 def prepare_features_from_log(
     log_path: pathlib.Path, config: Config, subject_id: int = 0
 ) -> pd.DataFrame:
-    df = pd.read_csv(
-        log_path,
-        sep=r"\s+",
-        header=None,
-    )
-    # Assume last column is label if present, otherwise fill with -1
-    if df.shape[1] == len(SENSOR_COLUMNS):
-        df[len(SENSOR_COLUMNS)] = -1
-    elif df.shape[1] != len(SENSOR_COLUMNS) + 1:
-        raise ValueError("Unexpected log format; expected 23 or 24 columns.")
-
-    df["timestamp"] = np.arange(len(df)) / float(config.sample_rate_hz)
-    df[SUBJECT_COLUMN] = subject_id
-    # Re-assign sensor columns and label names
-    data = df.copy()
-    col_names = SENSOR_COLUMNS + [LABEL_COLUMN]
-    data.columns = col_names + ["timestamp", SUBJECT_COLUMN]
+    # Last column is the label if present, otherwise labels are filled with -1
+    sensors, labels = split_log_columns(read_log(log_path))
+    data = pd.DataFrame(sensors, columns=SENSOR_COLUMNS)
+    data[LABEL_COLUMN] = labels
+    data["timestamp"] = np.arange(len(data)) / float(config.sample_rate_hz)
+    data[SUBJECT_COLUMN] = subject_id
 
     windows = create_windows(
         data,
@@ -48,6 +367,7 @@ def prepare_features_from_log(
         config.window_overlap_seconds,
         config.sample_rate_hz,
         feature_stats=config.features.get("stats"),
+        engine=config.features.get("engine", "batched"),
     )
 
     # Filter out activity 0 (unlabeled) to match training data
@@ -58,6 +378,169 @@ def prepare_features_from_log(
     return windows
 
 
+def iter_log_windows(
+    log_path: pathlib.Path, config: Config, chunk_bytes: int = CHUNK_BYTES
+) -> Iterator[Tuple[pd.DataFrame, np.ndarray]]:
+    """
+    Windows of a log computed block by block, as (windows, start_rows):
+    the same rows prepare_features_from_log returns, in the same order, plus
+    the log row where each window starts.
+
+    Only one block of ``chunk_bytes`` and the rows after the last emitted
+    window start are held at a time; that tail is prepended to the next block
+    so every window covers exactly the rows it covers in the batch path.
+    Memory therefore does not grow with the recording length. Windows
+    labelled 0 (unlabeled activity) are dropped like in the batch path;
+    unlabeled logs carry label -1 and keep every window.
+    """
+    window_size = int(config.window_seconds * config.sample_rate_hz)
+    overlap = int(config.window_overlap_seconds * config.sample_rate_hz)
+    step = max(1, window_size - overlap)
+    stats = config.features.get("stats") or DEFAULT_STATS
+    engine = config.features.get("engine", "batched")
+    columns = feature_names(SENSOR_COLUMNS, stats)
+
+    tail_values = np.empty((0, len(SENSOR_COLUMNS)))
+    tail_labels = np.empty(0, dtype=int)
+    tail_start = 0  # log row of tail_values[0]
+    for block in iter_log_blocks(log_path, chunk_bytes=chunk_bytes):
+        sensors, labels = split_log_columns(block)
+        values = np.concatenate([tail_values, sensors])
+        labels = np.concatenate([tail_labels, labels])
+        n_windows = (len(values) - window_size) // step + 1 if len(values) >= window_size else 0
+        if n_windows > 0:
+            used = (n_windows - 1) * step + window_size
+            X, y = window_features(
+                values[:used], labels[:used], window_size, step, stats, engine=engine
+            )
+            keep = y != 0
+            windows = pd.DataFrame(X[keep], columns=columns)
+            windows[LABEL_COLUMN] = y[keep]
+            yield windows, tail_start + np.flatnonzero(keep) * step
+        consumed = n_windows * step
+        tail_values, tail_labels = values[consumed:], labels[consumed:]
+        tail_start += consumed
+
+
+def predict_log_stream(
+    model,
+    log_path: pathlib.Path,
+    config: Config,
+    feature_columns: List[str],
+    chunk_bytes: int = CHUNK_BYTES,
+) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Predictions of a log, yielded as soon as each block is windowed.
+
+    ``window_index`` numbers windows like predict_windows does for the whole
+    log; ``start_seconds`` is where each window starts in the recording and
+    ``labels`` the ground truth (-1 for unlabeled logs).
+    """
+    emitted = 0
+    for windows, start_rows in iter_log_windows(log_path, config, chunk_bytes):
+        if windows.empty:
+            continue
+        proba = model.predict_proba(ensure_feature_order(windows, feature_columns))
+        yield {
+            "window_index": np.arange(emitted, emitted + len(windows)),
+            "start_seconds": start_rows / float(config.sample_rate_hz),
+            "predictions": model.classes_.take(np.argmax(proba, axis=1)),
+            "proba": proba,
+            "labels": windows[LABEL_COLUMN].to_numpy(),
+        }
+        emitted += len(windows)
+
+
+class StreamingPredictor:
+    """
+    Incremental windowing and prediction for live sensor samples.
+
+    Samples are written into a ring buffer of one window; every time the
+    buffer holds a complete window (the first after ``window_seconds``, then
+    one per step) that window is kept, and all windows completed by one
+    ``push`` are featurized and predicted together. Windows, their boundaries
+    and features match the batch path for the same sample sequence, so the
+    work per push is bounded by the number of windows it completes.
+    """
+
+    def __init__(self, model, feature_columns: List[str], config: Config):
+        self.model = model
+        self.feature_columns = feature_columns
+        self.sample_rate_hz = config.sample_rate_hz
+        self.window_size = int(config.window_seconds * config.sample_rate_hz)
+        overlap = int(config.window_overlap_seconds * config.sample_rate_hz)
+        self.step = max(1, self.window_size - overlap)
+        self.stats = config.features.get("stats") or DEFAULT_STATS
+        self.engine = config.features.get("engine", "batched")
+        self.columns = feature_names(SENSOR_COLUMNS, self.stats)
+        self._ring = np.empty((self.window_size, len(SENSOR_COLUMNS)))
+        self.received = 0  # samples pushed so far
+        self.emitted = 0  # windows predicted so far
+        self._next_end = self.window_size  # sample count that completes the next window
+
+    def _write(self, samples: np.ndarray) -> None:
+        pos = self.received % self.window_size
+        first = min(len(samples), self.window_size - pos)
+        self._ring[pos : pos + first] = samples[:first]
+        self._ring[: len(samples) - first] = samples[first:]
+        self.received += len(samples)
+
+    def _window(self) -> np.ndarray:
+        # Oldest sample first; the buffer holds exactly the last window.
+        pos = self.received % self.window_size
+        return np.concatenate([self._ring[pos:], self._ring[:pos]])
+
+    def push(self, samples) -> List[Dict[str, object]]:
+        """
+        Add (n x 23) samples in recording order; returns the predictions of
+        the windows they complete (possibly none).
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        if samples.ndim != 2 or samples.shape[1] != len(SENSOR_COLUMNS):
+            raise ValueError(
+                f"Se esperaban muestras de {len(SENSOR_COLUMNS)} canales, "
+                f"se recibió un arreglo de forma {samples.shape}"
+            )
+        completed = []
+        while len(samples):
+            take = min(len(samples), self._next_end - self.received)
+            self._write(samples[:take])
+            samples = samples[take:]
+            if self.received == self._next_end:
+                completed.append(self._window())
+                self._next_end += self.step
+        if not completed:
+            return []
+
+        # Windows back to back: one window_features call with step = window.
+        X, _ = window_features(
+            np.concatenate(completed),
+            np.full(len(completed) * self.window_size, -1),
+            self.window_size,
+            self.window_size,
+            self.stats,
+            engine=self.engine,
+        )
+        features = pd.DataFrame(X, columns=self.columns)
+        proba = self.model.predict_proba(ensure_feature_order(features, self.feature_columns))
+        preds = self.model.classes_.take(np.argmax(proba, axis=1))
+        names = [ACTIVITY_MAP.get(int(c), str(c)) for c in self.model.classes_]
+        results = []
+        for pred, probs in zip(preds, proba):
+            start = self.emitted * self.step
+            results.append(
+                {
+                    "window_index": self.emitted,
+                    "start_seconds": start / float(self.sample_rate_hz),
+                    "prediction": int(pred),
+                    "activity": ACTIVITY_MAP.get(int(pred), str(pred)),
+                    "proba": {name: float(p) for name, p in zip(names, probs)},
+                }
+            )
+            self.emitted += 1
+        return results
+
+
 def ensure_feature_order(
     features: pd.DataFrame, feature_columns: List[str]
 ) -> pd.DataFrame:
@@ -74,7 +557,8 @@ def predict_windows(
 ) -> Dict[str, object]:
     ordered = ensure_feature_order(features, feature_columns)
     proba = model.predict_proba(ordered)
-    preds = model.predict(ordered)
+    # Same rule as the forests' predict, without a second pass over the trees
+    preds = model.classes_.take(np.argmax(proba, axis=1))
     classes = list(model.classes_)
     per_window = []
     for idx, (pred, probs) in enumerate(zip(preds, proba)):
@@ -93,6 +577,52 @@ def predict_windows(
     return {"per_window": per_window, "aggregate": agg}
 
 
+def predict_windows_columnar(
+    model,
+    features: pd.DataFrame,
+    feature_columns: List[str],
+    proba_encoding: str = "float",
+) -> Dict[str, object]:
+    """
+    Same predictions as predict_windows in a columnar layout: class ids and
+    activity names once, ``predictions`` as indices into them and ``proba``
+    as a (windows x classes) array.
+
+    ``proba_encoding`` trades precision for payload size: ``float`` keeps the
+    probabilities as computed, ``float16`` rounds them to half precision
+    (written with 4 decimals) and ``uint8`` sends integers in 0..255 to be
+    divided by ``proba_scale``.
+    """
+    if proba_encoding not in PROBA_ENCODINGS:
+        raise ValueError(f"Unknown proba encoding: {proba_encoding}")
+    ordered = ensure_feature_order(features, feature_columns)
+    proba = model.predict_proba(ordered)
+    pred_index = np.argmax(proba, axis=1)
+    classes = list(model.classes_)
+
+    proba_scale = 1
+    if proba_encoding == "float16":
+        encoded = np.round(proba.astype(np.float16).astype(np.float64), 4)
+    elif proba_encoding == "uint8":
+        proba_scale = 255
+        encoded = np.rint(proba * proba_scale).astype(np.uint8)
+    else:
+        encoded = proba
+    return {
+        "format": "columnar",
+        "n_windows": int(len(proba)),
+        "classes": [int(c) for c in classes],
+        "activities": [ACTIVITY_MAP.get(int(c), str(c)) for c in classes],
+        "predictions": pred_index.tolist(),
+        "proba_encoding": proba_encoding,
+        "proba_scale": proba_scale,
+        "proba": encoded.tolist(),
+        "aggregate": aggregate_predictions(
+            model.classes_.take(pred_index), proba, classes
+        ),
+    }
+
+
 def aggregate_predictions(
     preds: np.ndarray, proba: np.ndarray, classes: List[int]
 ) -> Dict[str, object]:
@@ -1,25 +1,54 @@
 from __future__ import annotations
 
+import math
 import pathlib
-from typing import Dict, Tuple
+import pickle
+import time
+import warnings
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import joblib
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, confusion_matrix, f1_score
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.metrics import (
+    accuracy_score,
+    confusion_matrix,
+    f1_score,
+    precision_recall_fscore_support,
+)
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 
 from .config import Config
-from .constants import ACTIVITY_MAP, LABEL_COLUMN, SUBJECT_COLUMN
+from .constants import ACTIVITY_MAP, LABEL_COLUMN, SENSOR_COLUMNS, SUBJECT_COLUMN
+from .data import MHealthDataset
+from .feature_store import FeatureStore
 from .preprocess import (
     build_feature_matrix,
     create_windows,
-    filter_unlabeled_activity,
-    split_by_subject,
+    feature_names,
+    split_subjects,
+    subject_rows,
 )
-from .utils import ensure_dir, save_json, set_global_seed
+from .profiling import stage
+from .utils import ensure_dir, load_json, save_json, set_global_seed
+
+# Student forest settings; config.distill overrides any of them.
+DISTILL_DEFAULTS = {"n_estimators": 20, "max_depth": 8, "min_samples_leaf": 2}
+
+# Single-window predict_proba calls timed by measure_latency.
+LATENCY_REPEATS = 50
+
+# Forest growth settings; config.sizing overrides any of them.
+SIZING_DEFAULTS = {
+    "enabled": False,
+    "metric": "oob",
+    "step": 20,
+    "tolerance": 0.002,
+    "patience": 2,
+}
 
 
 def train_model(
@@ -35,13 +64,183 @@ def train_model(
         config: Configuration
         demo_df: Optional demo subjects data for evaluation only
     """
-    set_global_seed(config.random_seed)
+    windows = build_windows(df, config)
+
+    # Process demo data if provided
+    if demo_df is not None and len(demo_df) > 0:
+        demo_windows = build_windows(demo_df, config)
+    else:
+        demo_windows = None
+
+    return train_on_windows(windows, config, demo_windows=demo_windows)
+
+
+def build_windows(df: pd.DataFrame, config: Config) -> pd.DataFrame:
+    """
+    Windows of ``df`` with the configured feature settings.
+
+    Activity 0 (unlabeled) is removed to prevent class imbalance. Rows are
+    selected through a subject -> row index, so no filtered copy is made.
+    """
+    return create_windows(
+        df,
+        config.window_seconds,
+        config.window_overlap_seconds,
+        config.sample_rate_hz,
+        feature_stats=config.features.get("stats"),
+        engine=config.features.get("engine", "batched"),
+        workers=int(config.features.get("workers", 1)),
+        rows=subject_rows(df, drop_unlabeled=True),
+    )
+
+
+def subject_windows(
+    dataset: MHealthDataset, config: Config, subject_ids: Sequence[int]
+) -> pd.DataFrame:
+    """
+    Windows of ``subject_ids`` in subject order: read from the feature store
+    when ``features.store`` is on, otherwise windowed from the parsed logs.
+    """
+    if config.features.get("store", False):
+        return FeatureStore(config).windows(dataset, subject_ids)
+    if not subject_ids:
+        columns = feature_names(SENSOR_COLUMNS, config.features.get("stats"))
+        return pd.DataFrame(columns=columns + [LABEL_COLUMN, SUBJECT_COLUMN])
+    return build_windows(dataset.subjects(subject_ids), config)
+
+
+def build_pipeline(config: Config, n_jobs: int = -1, **clf_params) -> Pipeline:
+    """
+    Unfitted scaler + classifier pipeline from ``config.model``; keyword
+    arguments override or extend the RandomForestClassifier parameters.
+    """
+    params = {
+        "n_estimators": config.model.n_estimators,
+        "max_depth": config.model.max_depth,
+        "random_state": config.random_seed,
+        "class_weight": config.model.class_weight,
+        "n_jobs": n_jobs,
+    }
+    params.update(clf_params)
+    return Pipeline([("scaler", StandardScaler()), ("clf", RandomForestClassifier(**params))])
+
+
+def _oob_macro_f1(forest: RandomForestClassifier, y: np.ndarray) -> float:
+    # Windows that were in every bootstrap sample so far have no OOB vote.
+    votes = forest.oob_decision_function_
+    scored = np.isfinite(votes).all(axis=1) & (votes.sum(axis=1) > 0)
+    preds = forest.classes_.take(np.argmax(votes[scored], axis=1))
+    return f1_score(y[scored], preds, average="macro")
+
+
+def grow_forest(
+    pipeline: Pipeline,
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    config: Config,
+    X_val: Optional[pd.DataFrame] = None,
+    y_val: Optional[pd.Series] = None,
+) -> Dict[str, object]:
+    """
+    Fit ``pipeline`` growing its forest ``step`` trees at a time with
+    warm_start, up to ``config.model.n_estimators``.
+
+    After each increment the forest is scored by out-of-bag macro F1
+    (``metric: oob``) or validation macro F1 (``metric: val``). Growth stops
+    once ``patience`` increments in a row improve the best score by less than
+    ``tolerance``; the forest is then cut back to the smallest size scoring
+    within ``tolerance`` of the best. warm_start draws the same tree seeds as
+    a single fit, so the result equals a forest fitted with that size.
+    Returns the chosen size and the score curve.
+    """
+    params = {**SIZING_DEFAULTS, **config.sizing}
+    metric, step = str(params["metric"]), max(1, int(params["step"]))
+    tolerance, patience = float(params["tolerance"]), int(params["patience"])
+    if metric not in ("oob", "val"):
+        raise ValueError(f"Unknown sizing metric: {metric}")
+    if metric == "val" and (X_val is None or X_val.empty):
+        raise ValueError("sizing.metric 'val' needs validation windows")
+    max_trees = config.model.n_estimators
+
+    start = time.perf_counter()
+    scaler, forest = pipeline.named_steps["scaler"], pipeline.named_steps["clf"]
+    X_scaled = scaler.fit_transform(X_train)
+    y_values = np.asarray(y_train)
+    if metric == "val":
+        X_val_scaled = scaler.transform(X_val).astype(np.float32)
+        y_val_values = np.asarray(y_val)
+        val_votes = None
+    forest.set_params(warm_start=True, oob_score=metric == "oob")
+
+    curve = []
+    best, stale = -np.inf, 0
+    n_trees = 0
+    while n_trees < max_trees and stale < patience:
+        n_trees = min(n_trees + step, max_trees)
+        fitted = len(getattr(forest, "estimators_", []))
+        forest.set_params(n_estimators=n_trees)
+        with warnings.catch_warnings():
+            # Early increments leave some windows without OOB votes; they are
+            # skipped by _oob_macro_f1. Every increment fits the same data, so
+            # "balanced" class weights are the same for all trees.
+            warnings.filterwarnings("ignore", message="Some inputs do not have OOB scores")
+            warnings.filterwarnings("ignore", message="class_weight presets")
+            forest.fit(X_scaled, y_values)
+        if metric == "oob":
+            score = _oob_macro_f1(forest, y_values)
+        else:
+            # Same accumulation as the forest's predict_proba, one tree at a time.
+            for tree in forest.estimators_[fitted:]:
+                proba = tree.predict_proba(X_val_scaled, check_input=False)
+                val_votes = proba if val_votes is None else val_votes + proba
+            preds = forest.classes_.take(np.argmax(val_votes, axis=1))
+            score = f1_score(y_val_values, preds, average="macro")
+        curve.append({"n_estimators": n_trees, "macro_f1": float(score)})
+        stale = stale + 1 if score - best < tolerance else 0
+        best = max(best, score)
 
-    # Remove activity 0 (unlabeled) to prevent class imbalance
-    df = filter_unlabeled_activity(df)
+    chosen = next(p["n_estimators"] for p in curve if p["macro_f1"] >= best - tolerance)
+    forest.estimators_ = forest.estimators_[:chosen]
+    forest.set_params(n_estimators=chosen, warm_start=False, oob_score=False)
+    # OOB votes cover the grown forest, not the kept one, and weigh as much
+    # as the training set; they are not part of the served model.
+    for attr in ("oob_score_", "oob_decision_function_"):
+        if hasattr(forest, attr):
+            delattr(forest, attr)
+    return {
+        "metric": metric,
+        "step": step,
+        "tolerance": tolerance,
+        "patience": patience,
+        "max_estimators": max_trees,
+        "grown_estimators": n_trees,
+        "n_estimators": chosen,
+        "best_macro_f1": float(best),
+        "curve": curve,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def train_on_windows(
+    windows: pd.DataFrame,
+    config: Config,
+    demo_windows: pd.DataFrame = None,
+) -> Dict[str, object]:
+    """
+    Train model on precomputed windows (create_windows format).
+
+    Windows are computed per subject, so splitting them by subject gives the
+    same matrices as windowing each split separately.
+
+    Args:
+        windows: Windows of the training subjects (no demo subjects, no activity 0)
+        config: Configuration
+        demo_windows: Optional windows of the demo subjects, evaluation only
+    """
+    set_global_seed(config.random_seed)
 
     # Verify no demo subjects leaked into training data
-    training_subjects = set(df[SUBJECT_COLUMN].unique())
+    training_subjects = set(windows[SUBJECT_COLUMN].unique())
     demo_subjects = set(config.excluded_subjects_demo)
     leaked = training_subjects & demo_subjects
     if leaked:
@@ -53,98 +252,530 @@ def train_model(
     print(f"[SEGURIDAD] Sujetos excluidos (demo): {sorted(demo_subjects)}")
     print(f"[SEGURIDAD] Verificación OK: No hay fuga de datos")
 
-    train_df_raw, val_df_raw, test_df_raw = split_by_subject(df, config)
-
-    feature_stats = config.features.get("stats")
-    train_windows = create_windows(
-        train_df_raw,
-        config.window_seconds,
-        config.window_overlap_seconds,
-        config.sample_rate_hz,
-        feature_stats=feature_stats,
-    )
-    val_windows = create_windows(
-        val_df_raw,
-        config.window_seconds,
-        config.window_overlap_seconds,
-        config.sample_rate_hz,
-        feature_stats=feature_stats,
-    )
-    test_windows = create_windows(
-        test_df_raw,
-        config.window_seconds,
-        config.window_overlap_seconds,
-        config.sample_rate_hz,
-        feature_stats=feature_stats,
-    )
-
-    # Process demo data if provided
-    if demo_df is not None and len(demo_df) > 0:
-        demo_df_filtered = filter_unlabeled_activity(demo_df)
-        demo_windows = create_windows(
-            demo_df_filtered,
-            config.window_seconds,
-            config.window_overlap_seconds,
-            config.sample_rate_hz,
-            feature_stats=feature_stats,
-        )
-    else:
+    train_subj, val_subj, test_subj = split_subjects(training_subjects, config)
+    subject_col = windows[SUBJECT_COLUMN]
+    train_windows = windows[subject_col.isin(train_subj)]
+    val_windows = windows[subject_col.isin(val_subj)]
+    test_windows = windows[subject_col.isin(test_subj)]
+    if demo_windows is None:
         demo_windows = pd.DataFrame()
 
     X_train, y_train = build_feature_matrix(train_windows)
-    X_val, y_val = build_feature_matrix(val_windows)
-    X_test, y_test = build_feature_matrix(test_windows)
-    X_demo, y_demo = build_feature_matrix(demo_windows)
-
-    scaler = StandardScaler()
-    clf = RandomForestClassifier(
-        n_estimators=config.model.n_estimators,
-        max_depth=config.model.max_depth,
-        random_state=config.random_seed,
-        class_weight=config.model.class_weight,
-        n_jobs=-1,
-    )
 
-    pipeline = Pipeline([("scaler", scaler), ("clf", clf)])
-    pipeline.fit(X_train, y_train)
+    pipeline = build_pipeline(config)
+    sizing = None
+    with stage("fit", windows=len(X_train), features=X_train.shape[1]) as info:
+        if config.sizing.get("enabled", SIZING_DEFAULTS["enabled"]):
+            sizing = grow_forest(
+                pipeline, X_train, y_train, config, *build_feature_matrix(val_windows)
+            )
+            info["n_estimators"] = sizing["n_estimators"]
+        else:
+            pipeline.fit(X_train, y_train)
 
-    metrics = {
-        "val": compute_metrics(pipeline, X_val, y_val),
-        "test": compute_metrics(pipeline, X_test, y_test),
-        "demo": compute_metrics(pipeline, X_demo, y_demo),
-        "train": compute_metrics(pipeline, X_train, y_train),
-    }
+    train_sample = config.evaluation.get("train_sample")
+    metrics = {}
+    for name, split_windows in [
+        ("val", val_windows),
+        ("test", test_windows),
+        ("demo", demo_windows),
+        ("train", train_windows),
+    ]:
+        sample = None if name != "train" or train_sample is None else int(train_sample)
+        with stage(f"evaluate_{name}") as info:
+            metrics[name] = evaluate_windows(
+                pipeline, split_windows, sample=sample, seed=config.random_seed
+            )
+            info["windows"] = metrics[name].get("n_windows", 0)
 
     artifacts = {
         "pipeline": pipeline,
         "feature_columns": list(X_train.columns),
         "metrics": metrics,
         "splits": {
-            "train_subjects": sorted(train_df_raw[SUBJECT_COLUMN].unique().tolist()),
-            "val_subjects": sorted(val_df_raw[SUBJECT_COLUMN].unique().tolist()),
-            "test_subjects": sorted(test_df_raw[SUBJECT_COLUMN].unique().tolist()),
-            "demo_subjects": sorted(demo_df[SUBJECT_COLUMN].unique().tolist())
-            if demo_df is not None and len(demo_df) > 0
+            "train_subjects": sorted(int(s) for s in train_subj),
+            "val_subjects": sorted(int(s) for s in val_subj),
+            "test_subjects": sorted(int(s) for s in test_subj),
+            "demo_subjects": sorted(demo_windows[SUBJECT_COLUMN].unique().tolist())
+            if len(demo_windows) > 0
             else config.excluded_subjects_demo,
         },
     }
+    if sizing is not None:
+        artifacts["forest_sizing"] = sizing
+    return artifacts
+
+
+def _loso_fold(
+    X: np.ndarray,
+    y: np.ndarray,
+    subjects: np.ndarray,
+    held_out: int,
+    labels: List[int],
+    config: Config,
+    n_jobs: int,
+) -> Dict[str, object]:
+    """
+    Fit on every subject but ``held_out`` and score on ``held_out``. The
+    confusion matrix is indexed by ``labels`` so folds line up even when a
+    subject lacks an activity.
+    """
+    start = time.perf_counter()
+    test_mask = subjects == held_out
+    pipeline = build_pipeline(config, n_jobs=n_jobs)
+    pipeline.fit(X[~test_mask], y[~test_mask])
+    fit_seconds = time.perf_counter() - start
+    preds = pipeline.predict(X[test_mask])
+    return {
+        "subject": int(held_out),
+        "n_train_windows": int((~test_mask).sum()),
+        "n_test_windows": int(test_mask.sum()),
+        "accuracy": accuracy_score(y[test_mask], preds),
+        "macro_f1": f1_score(y[test_mask], preds, average="macro"),
+        "confusion_matrix": confusion_matrix(y[test_mask], preds, labels=labels).tolist(),
+        "labels": labels,
+        "fit_seconds": fit_seconds,
+        "wall_seconds": time.perf_counter() - start,
+        "predictions": preds.tolist(),
+    }
+
+
+def cross_validate_loso(
+    windows: pd.DataFrame, config: Config, n_jobs: int = -1
+) -> Dict[str, object]:
+    """
+    Leave-one-subject-out cross-validation on precomputed windows.
+
+    One fold per subject in ``windows``; folds run in parallel (``n_jobs``
+    processes, each forest single-threaded) and share the same feature matrix,
+    which joblib memory-maps into the workers instead of copying it.
+    """
+    set_global_seed(config.random_seed)
+
+    subjects = windows[SUBJECT_COLUMN].to_numpy()
+    leaked = set(subjects.tolist()) & set(config.excluded_subjects_demo)
+    if leaked:
+        raise ValueError(
+            f"FUGA DE DATOS DETECTADA: Sujetos demo {leaked} encontrados en datos de entrenamiento!"
+        )
+
+    X, y = build_feature_matrix(windows)
+    X_values, y_values = X.to_numpy(), y.to_numpy()
+    held_out = sorted(np.unique(subjects).tolist())
+    labels = sorted(np.unique(y_values).tolist())
+
+    start = time.perf_counter()
+    with stage("loso_folds", folds=len(held_out), windows=len(X_values)):
+        folds = joblib.Parallel(n_jobs=min(joblib.effective_n_jobs(n_jobs), len(held_out)))(
+            joblib.delayed(_loso_fold)(X_values, y_values, subjects, s, labels, config, 1)
+            for s in held_out
+        )
+    wall_seconds = time.perf_counter() - start
+
+    # Pooled scores over every held-out window, next to the per-fold spread.
+    y_pooled = np.concatenate([y_values[subjects == f["subject"]] for f in folds])
+    preds_pooled = np.concatenate([f.pop("predictions") for f in folds])
+    accuracies = [f["accuracy"] for f in folds]
+    macro_f1s = [f["macro_f1"] for f in folds]
+    aggregate = {
+        "n_folds": len(folds),
+        "accuracy_mean": float(np.mean(accuracies)),
+        "accuracy_std": float(np.std(accuracies)),
+        "macro_f1_mean": float(np.mean(macro_f1s)),
+        "macro_f1_std": float(np.std(macro_f1s)),
+        "pooled_accuracy": accuracy_score(y_pooled, preds_pooled),
+        "pooled_macro_f1": f1_score(y_pooled, preds_pooled, average="macro"),
+        "pooled_confusion_matrix": confusion_matrix(
+            y_pooled, preds_pooled, labels=labels
+        ).tolist(),
+        "labels": labels,
+        "fold_seconds_total": float(sum(f["wall_seconds"] for f in folds)),
+        "wall_seconds": wall_seconds,
+    }
+    return {"cv": "loso", "folds": folds, "aggregate": aggregate}
+
+
+def _remap_thresholds(
+    forest: RandomForestClassifier,
+    old_mean: np.ndarray,
+    old_scale: np.ndarray,
+    new_mean: np.ndarray,
+    new_scale: np.ndarray,
+) -> None:
+    """
+    Move every split threshold from the old scaled feature space to the new
+    one, so existing trees keep making the same decisions on raw features
+    after the scaler statistics change.
+    """
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        internal = tree.children_left != -1
+        features = tree.feature[internal]
+        threshold = tree.threshold  # view onto the tree's node array
+        raw = threshold[internal] * old_scale[features] + old_mean[features]
+        threshold[internal] = (raw - new_mean[features]) / new_scale[features]
+
+
+def update_forest(
+    pipeline: Pipeline,
+    old_windows: pd.DataFrame,
+    new_windows: pd.DataFrame,
+) -> Dict[str, object]:
+    """
+    Grow a fitted scaler + forest pipeline with trees for new windows.
+
+    The scaler statistics are updated with ``partial_fit`` on the new windows
+    only, and the existing trees' thresholds are remapped to the new scaling.
+    ``warm_start`` then adds trees in proportion to the new data
+    (``n_trees * new / old``, at least one), fitted on old + new windows, so
+    the cost follows the size of the update rather than of the corpus.
+    """
+    scaler = pipeline.named_steps["scaler"]
+    forest = pipeline.named_steps["clf"]
+
+    X_old, y_old = build_feature_matrix(old_windows)
+    X_new, y_new = build_feature_matrix(new_windows)
+    X_new = X_new[list(X_old.columns)]
+    classes = set(np.unique(np.concatenate([y_old, y_new])).tolist())
+    if classes != set(forest.classes_.tolist()):
+        raise ValueError(
+            f"Incremental update changes the class set {sorted(forest.classes_.tolist())} "
+            f"-> {sorted(classes)}; run a full training instead."
+        )
+
+    old_mean, old_scale = scaler.mean_.copy(), scaler.scale_.copy()
+    scaler.partial_fit(X_new)
+    _remap_thresholds(forest, old_mean, old_scale, scaler.mean_, scaler.scale_)
+
+    trees_before = len(forest.estimators_)
+    trees_added = max(1, int(math.ceil(trees_before * len(X_new) / max(1, len(X_old)))))
+    X_all = pd.concat([X_old, X_new], ignore_index=True)
+    y_all = pd.concat([y_old, y_new], ignore_index=True)
+    forest.set_params(warm_start=True, n_estimators=trees_before + trees_added)
+    with warnings.catch_warnings():
+        # The new trees see the full augmented data, so "balanced" class
+        # weights are estimated on the right distribution.
+        warnings.filterwarnings("ignore", message="class_weight presets")
+        forest.fit(scaler.transform(X_all), y_all)
+    forest.set_params(warm_start=False)
+
+    return {
+        "n_old_windows": int(len(X_old)),
+        "n_new_windows": int(len(X_new)),
+        "trees_before": trees_before,
+        "trees_added": trees_added,
+        "n_estimators": len(forest.estimators_),
+        "scaler_samples_seen": int(scaler.n_samples_seen_),
+    }
+
+
+def train_incremental(
+    dataset: MHealthDataset,
+    config: Config,
+    subject_ids: Optional[Sequence[int]] = None,
+) -> Optional[Dict[str, object]]:
+    """
+    Add new training subjects to the saved model without a full retrain.
+
+    New subjects default to every non-demo subject of ``dataset`` that the
+    saved model has not seen in any split. Windows come from subject_windows:
+    with the feature store on, only the new subjects are windowed and old
+    training windows and the evaluation splits are read back from it. Returns artifacts for
+    ``save_artifacts`` (with the update appended to ``lineage``) or None when
+    there is nothing new.
+    """
+    set_global_seed(config.random_seed)
+    pipeline = joblib.load(config.artifacts["model_path"])
+    model_info = load_json(config.artifacts["model_info"])
+    splits = {k: list(v) for k, v in model_info["splits"].items()}
+
+    known = set().union(*splits.values())
+    demo = set(config.excluded_subjects_demo)
+    if subject_ids is None:
+        subject_ids = [s for s in dataset.train_subject_ids if s not in known]
+    new_subjects = sorted(int(s) for s in subject_ids if s not in splits["train_subjects"])
+    leaked = set(new_subjects) & (demo | set(splits["val_subjects"]) | set(splits["test_subjects"]))
+    if leaked:
+        raise ValueError(
+            f"FUGA DE DATOS DETECTADA: Sujetos {sorted(leaked)} son demo/val/test y no pueden entrenarse!"
+        )
+    if not new_subjects:
+        return None
+
+    start = time.perf_counter()
+    old_windows = subject_windows(dataset, config, splits["train_subjects"])
+    new_windows = subject_windows(dataset, config, new_subjects)
+    with stage("update_forest", windows=len(old_windows) + len(new_windows)):
+        update = update_forest(pipeline, old_windows, new_windows)
+
+    splits["train_subjects"] = sorted(set(splits["train_subjects"]) | set(new_subjects))
+    train_windows = pd.concat([old_windows, new_windows], ignore_index=True)
+    evaluation = {
+        name: subject_windows(
+            dataset, config, [s for s in splits[f"{name}_subjects"] if s in dataset]
+        )
+        for name in ("val", "test", "demo")
+    }
+    feature_columns = list(model_info["feature_columns"])
+    metrics = {name: evaluate_windows(pipeline, windows) for name, windows in evaluation.items()}
+    train_sample = config.evaluation.get("train_sample")
+    metrics["train"] = evaluate_windows(
+        pipeline,
+        train_windows,
+        sample=None if train_sample is None else int(train_sample),
+        seed=config.random_seed,
+    )
+
+    update.update(
+        {
+            "added_subjects": new_subjects,
+            "seconds": time.perf_counter() - start,
+            "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+    )
+    artifacts = {
+        "pipeline": pipeline,
+        "feature_columns": feature_columns,
+        "metrics": metrics,
+        "splits": splits,
+        "lineage": list(model_info.get("lineage", [])) + [update],
+    }
+    if "forest_sizing" in model_info:
+        artifacts["forest_sizing"] = model_info["forest_sizing"]
     return artifacts
 
 
+class DistilledForest:
+    """
+    Student model: a shallow multi-output regression forest fitted to a
+    teacher classifier's predict_proba. Exposes the classifier interface used
+    by inference (classes_, predict, predict_proba).
+    """
+
+    def __init__(
+        self,
+        n_estimators: int = 20,
+        max_depth: Optional[int] = 8,
+        min_samples_leaf: int = 1,
+        random_state: Optional[int] = None,
+    ):
+        self.forest_ = RandomForestRegressor(
+            n_estimators=n_estimators,
+            max_depth=max_depth,
+            min_samples_leaf=min_samples_leaf,
+            random_state=random_state,
+        )
+
+    @property
+    def estimators_(self) -> list:
+        return self.forest_.estimators_
+
+    def fit(self, X: pd.DataFrame, soft_targets: np.ndarray, classes: Sequence[int]) -> "DistilledForest":
+        self.classes_ = np.asarray(classes)
+        # Fit on every core; predict single-threaded, which is faster for the
+        # small batches served per request.
+        self.forest_.set_params(n_jobs=-1)
+        self.forest_.fit(X, soft_targets)
+        self.forest_.set_params(n_jobs=None)
+        return self
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        proba = np.clip(self.forest_.predict(X), 0.0, None)
+        total = proba.sum(axis=1, keepdims=True)
+        total[total == 0] = 1.0
+        return proba / total
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def model_footprint(model) -> Dict[str, int]:
+    """
+    Pickled size and total tree node count of a forest model or pipeline.
+    """
+    forest = model.named_steps["clf"] if isinstance(model, Pipeline) else model
+    return {
+        "model_bytes": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+        "n_nodes": int(sum(t.tree_.node_count for t in forest.estimators_)),
+    }
+
+
+def measure_latency(model, X, repeats: int = LATENCY_REPEATS) -> Dict[str, float]:
+    """
+    Median single-window predict_proba latency and batch cost per window.
+    """
+    rows = X.iloc if isinstance(X, pd.DataFrame) else X
+    single = []
+    for i in range(repeats):
+        row = rows[i % len(X) : i % len(X) + 1]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        single.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    model.predict_proba(X)
+    batch = time.perf_counter() - start
+    return {
+        "latency_ms": float(np.median(single) * 1e3),
+        "batch_us_per_window": float(batch / len(X) * 1e6),
+    }
+
+
+def distill_model(
+    teacher: Pipeline,
+    train_windows: pd.DataFrame,
+    eval_windows: Dict[str, pd.DataFrame],
+    config: Config,
+) -> Dict[str, object]:
+    """
+    Fit a DistilledForest to the teacher's probabilities on the training
+    windows, then report its metrics (as train_on_windows reports the
+    teacher's), agreement with the teacher, latency and size next to the
+    teacher's.
+
+    Student settings come from the ``distill`` section of the config.
+    """
+    params = {**DISTILL_DEFAULTS, **config.distill}
+    X_train, _ = build_feature_matrix(train_windows)
+    student = DistilledForest(
+        n_estimators=int(params["n_estimators"]),
+        max_depth=None if params["max_depth"] is None else int(params["max_depth"]),
+        min_samples_leaf=int(params["min_samples_leaf"]),
+        random_state=config.random_seed,
+    )
+    start = time.perf_counter()
+    student.fit(X_train, teacher.predict_proba(X_train), teacher.classes_)
+    fit_seconds = time.perf_counter() - start
+
+    # Same evaluate_windows path (per-subject breakdown, train sample) as the
+    # teacher's metrics in train_on_windows, so the two reports line up.
+    train_sample = config.evaluation.get("train_sample")
+    metrics, agreement = {}, {}
+    for name, windows in [*eval_windows.items(), ("train", train_windows)]:
+        sample = None if name != "train" or train_sample is None else int(train_sample)
+        metrics[name] = evaluate_windows(
+            student, windows, sample=sample, seed=config.random_seed
+        )
+        X, _ = build_feature_matrix(windows)
+        agreement[name] = (
+            float(np.mean(student.predict(X) == teacher.predict(X))) if len(X) else None
+        )
+
+    X_latency = build_feature_matrix(eval_windows.get("val", train_windows))[0]
+    if X_latency.empty:
+        X_latency = X_train
+    info = {
+        "model_type": "distilled_forest",
+        "params": params,
+        "fit_seconds": fit_seconds,
+        "teacher_agreement": agreement,
+        "student": {
+            **measure_latency(student, X_latency),
+            **model_footprint(student),
+        },
+        "teacher": {
+            **measure_latency(teacher, X_latency),
+            **model_footprint(teacher),
+        },
+    }
+    return {"student": student, "metrics": metrics, "info": info}
+
+
+def save_student(result: Dict[str, object], config: Config) -> None:
+    ensure_dir(config.artifacts["dir"])
+    joblib.dump(result["student"], config.artifacts["student_model_path"])
+    save_json(config.artifacts["student_metrics"], result["metrics"])  # type: ignore[arg-type]
+    save_json(config.artifacts["student_info"], result["info"])  # type: ignore[arg-type]
+
+
 def compute_metrics(
-    model: Pipeline, X: pd.DataFrame, y_true: pd.Series
+    model, X: pd.DataFrame, y_true: pd.Series, subjects: Optional[pd.Series] = None
 ) -> Dict[str, object]:
+    """
+    Metrics of one split from a single predict_proba pass.
+
+    Predictions are the argmax over ``model.classes_``, which is what the
+    forests' predict returns, so accuracy, macro F1 and the confusion matrix
+    match a separate predict call. Adds the prediction throughput to
+    prediction_metrics.
+    """
     if X.empty or y_true.empty:
         return {"accuracy": None, "macro_f1": None, "confusion_matrix": []}
-    preds = model.predict(X)
-    acc = accuracy_score(y_true, preds)
-    f1 = f1_score(y_true, preds, average="macro")
-    cm = confusion_matrix(y_true, preds)
-    return {
-        "accuracy": acc,
-        "macro_f1": f1,
-        "confusion_matrix": cm.tolist(),
+    start = time.perf_counter()
+    proba = model.predict_proba(X)
+    predict_seconds = time.perf_counter() - start
+    preds = np.asarray(model.classes_).take(np.argmax(proba, axis=1))
+    metrics = prediction_metrics(y_true, preds, subjects)
+    metrics["predict_seconds"] = predict_seconds
+    metrics["windows_per_second"] = (
+        len(preds) / predict_seconds if predict_seconds > 0 else None
+    )
+    return metrics
+
+
+def prediction_metrics(
+    y_true, preds: np.ndarray, subjects: Optional[pd.Series] = None
+) -> Dict[str, object]:
+    """
+    Accuracy, macro F1, confusion matrix and per-class precision/recall/F1 of
+    precomputed predictions; per-subject accuracy and macro F1 when
+    ``subjects`` is given.
+    """
+    y_true = np.asarray(y_true)
+    labels = np.union1d(y_true, preds)
+    precision, recall, f1, support = precision_recall_fscore_support(
+        y_true, preds, labels=labels, zero_division=0
+    )
+    metrics = {
+        "accuracy": accuracy_score(y_true, preds),
+        "macro_f1": f1_score(y_true, preds, average="macro"),
+        "confusion_matrix": confusion_matrix(y_true, preds, labels=labels).tolist(),
+        "labels": labels.tolist(),
+        "per_class": {
+            str(label): {
+                "activity": ACTIVITY_MAP.get(int(label), str(label)),
+                "precision": float(precision[i]),
+                "recall": float(recall[i]),
+                "f1": float(f1[i]),
+                "support": int(support[i]),
+            }
+            for i, label in enumerate(labels)
+        },
+        "n_windows": int(len(y_true)),
     }
+    if subjects is not None:
+        subjects = np.asarray(subjects)
+        per_subject = {}
+        for subject in np.unique(subjects):
+            mask = subjects == subject
+            per_subject[str(int(subject))] = {
+                "accuracy": accuracy_score(y_true[mask], preds[mask]),
+                "macro_f1": f1_score(y_true[mask], preds[mask], average="macro"),
+                "n_windows": int(mask.sum()),
+            }
+        metrics["per_subject"] = per_subject
+    return metrics
+
+
+def evaluate_windows(
+    model, windows: pd.DataFrame, sample: Optional[int] = None, seed: int = 0
+) -> Dict[str, object]:
+    """
+    compute_metrics on windows in create_windows format. With ``sample``, only
+    that many windows (drawn without replacement, in their original order)
+    are scored, e.g. to keep train metrics cheap.
+    """
+    total = len(windows)
+    if total == 0:
+        return {"accuracy": None, "macro_f1": None, "confusion_matrix": []}
+    if sample is not None and total > sample:
+        rows = np.sort(np.random.default_rng(seed).choice(total, size=sample, replace=False))
+        windows = windows.iloc[rows]
+    X, y = build_feature_matrix(windows)
+    subjects = windows[SUBJECT_COLUMN] if SUBJECT_COLUMN in windows else None
+    metrics = compute_metrics(model, X, y, subjects)
+    if len(windows) < total:
+        metrics["sampled_from"] = total
+    return metrics
 
 
 def save_artifacts(artifacts: Dict[str, object], config: Config) -> None:
@@ -168,6 +799,10 @@ def save_artifacts(artifacts: Dict[str, object], config: Config) -> None:
         "feature_columns": artifacts["feature_columns"],
         "activity_labels": ACTIVITY_MAP,
     }
+    if "forest_sizing" in artifacts:
+        info["forest_sizing"] = artifacts["forest_sizing"]
+    if "lineage" in artifacts:
+        info["lineage"] = artifacts["lineage"]
     save_json(config.artifacts["model_info"], info)  # type: ignore[arg-type]
 
     feature_cols = artifacts["feature_columns"]
@@ -175,3 +810,24 @@ def save_artifacts(artifacts: Dict[str, object], config: Config) -> None:
         config.artifacts["feature_metadata"],  # type: ignore[arg-type]
         {"feature_columns": feature_cols},
     )
+
+
+def save_cv_metrics(cv_results: Dict[str, object], config: Config) -> pathlib.Path:
+    path = pathlib.Path(
+        config.artifacts.get(
+            "cv_metrics", pathlib.Path(config.artifacts["dir"]) / "cv_metrics.json"
+        )
+    )
+    payload = dict(cv_results)
+    payload.update(
+        {
+            "version": config.version,
+            "model_type": config.model.type,
+            "random_seed": config.random_seed,
+            "window_seconds": config.window_seconds,
+            "window_overlap_seconds": config.window_overlap_seconds,
+            "sample_rate_hz": config.sample_rate_hz,
+        }
+    )
+    save_json(path, payload)  # type: ignore[arg-type]
+    return path
@@ -0,0 +1,118 @@
+"""
+Whitespace-separated MHEALTH log parser shared by training and inference.
+"""
+from __future__ import annotations
+
+import io
+import itertools
+import pathlib
+from typing import BinaryIO, Iterator, Sequence, Tuple, Union
+
+import numpy as np
+
+from .constants import ALL_COLUMNS, SENSOR_COLUMNS
+
+LogSource = Union[str, pathlib.Path, BinaryIO]
+
+# Accepted column counts: sensors only, or sensors plus the activity label.
+LOG_COLUMN_COUNTS = (len(SENSOR_COLUMNS), len(ALL_COLUMNS))
+
+CHUNK_BYTES = 4 << 20
+
+
+def _column_error(columns: Sequence[int]) -> ValueError:
+    expected = " or ".join(str(c) for c in columns)
+    return ValueError(f"Unexpected log format; expected {expected} columns.")
+
+
+def _open(source: LogSource) -> Tuple[BinaryIO, bool]:
+    if isinstance(source, (str, pathlib.Path)):
+        return open(source, "rb"), True
+    return source, False
+
+
+def _read_first_line(f: BinaryIO, columns: Sequence[int]) -> Tuple[bytes, int]:
+    """
+    First line of the log and its column count, validated against ``columns``.
+    """
+    first = f.readline()
+    n_columns = len(first.split())
+    if n_columns == 0:
+        raise ValueError("Empty log file.")
+    if n_columns not in columns:
+        raise _column_error(columns)
+    return first, n_columns
+
+
+def iter_log_blocks(
+    source: LogSource,
+    chunk_bytes: int = CHUNK_BYTES,
+    columns: Sequence[int] = LOG_COLUMN_COUNTS,
+) -> Iterator[np.ndarray]:
+    """
+    Yield consecutive (rows x columns) float64 blocks of a log.
+
+    The column count is validated on the first line; every block is cut on a
+    line boundary so rows never straddle two blocks.
+    """
+    f, owned = _open(source)
+    try:
+        pending, n_columns = _read_first_line(f, columns)
+        while True:
+            data = f.read(chunk_bytes)
+            if data:
+                data = pending + data
+                cut = data.rfind(b"\n") + 1
+                if cut == 0:
+                    pending = data
+                    continue
+                block, pending = data[:cut], data[cut:]
+            else:
+                block, pending = pending, b""
+            if block.strip():
+                values = np.loadtxt(io.BytesIO(block), dtype=np.float64, ndmin=2)
+                if values.shape[1] != n_columns:
+                    raise _column_error([n_columns])
+                yield values
+            if not data:
+                break
+    finally:
+        if owned:
+            f.close()
+
+
+def read_log(
+    source: LogSource,
+    columns: Sequence[int] = LOG_COLUMN_COUNTS,
+) -> np.ndarray:
+    """
+    Parse a whole log into one (rows x columns) float64 array.
+
+    The column count is validated on the first line; the stream is then
+    handed to np.loadtxt, whose C reader consumes it in chunks and writes
+    straight into the array it returns, so no per-block arrays are built and
+    copied. Files and archive members are never read into memory whole.
+    """
+    f, owned = _open(source)
+    try:
+        first, n_columns = _read_first_line(f, columns)
+        values = np.loadtxt(itertools.chain([first], f), dtype=np.float64, ndmin=2)
+    finally:
+        if owned:
+            f.close()
+    if values.shape[1] != n_columns:
+        raise _column_error([n_columns])
+    return values
+
+
+def split_log_columns(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split parsed rows into (sensors, activity); activity is -1 when the log
+    carries no label column.
+    """
+    sensors = values[:, : len(SENSOR_COLUMNS)]
+    if values.shape[1] == len(ALL_COLUMNS):
+        activity = values[:, len(SENSOR_COLUMNS)].astype(int)
+    else:
+        activity = np.full(len(values), -1, dtype=int)
+    return sensors, activity
@@ -1,14 +1,38 @@
 from __future__ import annotations
 
 import collections
-from typing import Dict, List, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
 
 from .config import Config
-from .constants import ACTIVITY_MAP, LABEL_COLUMN, SENSOR_COLUMNS, SUBJECT_COLUMN
+from .constants import (
+    ACTIVITY_MAP,
+    LABEL_COLUMN,
+    SENSOR_COLUMNS,
+    SUBJECT_COLUMN,
+    TIMESTAMP_COLUMN,
+)
+from .profiling import stage
+
+if TYPE_CHECKING:  # sklearn is imported lazily so serving can run without it
+    from sklearn.preprocessing import StandardScaler
+
+DEFAULT_STATS = ["mean", "std", "min", "max", "median", "mad", "energy"]
+
+# Windows processed per NumPy call; bounds the temporaries of median/mad.
+WINDOW_BATCH = 1024
+
+# Subject id -> row positions into a raw frame (see subject_rows).
+RowIndex = Dict[int, np.ndarray]
+
+# Windows per create_windows task. Long subjects are cut into several tasks so
+# the work spreads over more cores than there are subjects; the cut depends
+# only on this constant, never on the worker count.
+TASK_WINDOWS = 2048
 
 
 def filter_demo_subjects(
@@ -28,10 +52,13 @@ def filter_unlabeled_activity(df: pd.DataFrame) -> pd.DataFrame:
     return df[df[LABEL_COLUMN] != 0].copy()
 
 
-def split_by_subject(
-    df: pd.DataFrame, config: Config
-) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-    subjects = sorted(df[SUBJECT_COLUMN].unique())
+def split_subjects(
+    subject_ids: Sequence[int], config: Config
+) -> Tuple[List[int], List[int], List[int]]:
+    """
+    Seeded (train, val, test) partition of subject ids.
+    """
+    subjects = sorted(subject_ids)
     rng = np.random.default_rng(config.random_seed)
     rng.shuffle(subjects)
     total = len(subjects)
@@ -42,6 +69,13 @@ def split_by_subject(
     train_subj = subjects[:train_n]
     val_subj = subjects[train_n : train_n + val_n]
     test_subj = subjects[train_n + val_n : train_n + val_n + test_n]
+    return train_subj, val_subj, test_subj
+
+
+def split_by_subject(
+    df: pd.DataFrame, config: Config
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    train_subj, val_subj, test_subj = split_subjects(df[SUBJECT_COLUMN].unique(), config)
 
     train_df = df[df[SUBJECT_COLUMN].isin(train_subj)].copy()
     val_df = df[df[SUBJECT_COLUMN].isin(val_subj)].copy()
@@ -50,16 +84,416 @@ def split_by_subject(
     return train_df, val_df, test_df
 
 
-def _window_indices(
-    n_samples: int, window_size: int, step_size: int
+def subject_rows(
+    df: pd.DataFrame,
+    subjects: Sequence[int] | None = None,
+    drop_unlabeled: bool = False,
+) -> RowIndex:
+    """
+    Row positions of each subject in ``df`` (ascending), optionally limited to
+    ``subjects`` and without activity 0 rows.
+
+    Filtering and splitting through this index never copies the frame; rows
+    are only gathered when create_windows builds a subject's windows.
+    """
+    subject_col = df[SUBJECT_COLUMN].to_numpy()
+    order = np.argsort(subject_col, kind="stable")
+    if drop_unlabeled:
+        order = order[df[LABEL_COLUMN].to_numpy()[order] != 0]
+    ids, starts = np.unique(subject_col[order], return_index=True)
+    bounds = np.append(starts, len(order))
+    wanted = None if subjects is None else {int(s) for s in subjects}
+    return {
+        int(s): order[start:stop]
+        for s, start, stop in zip(ids, bounds[:-1], bounds[1:])
+        if wanted is None or int(s) in wanted
+    }
+
+
+def split_rows(rows: RowIndex, config: Config) -> Tuple[RowIndex, RowIndex, RowIndex]:
+    """
+    split_by_subject over a row index: (train, val, test) sub-indexes.
+    """
+    return tuple(
+        {s: rows[s] for s in part} for part in split_subjects(list(rows), config)
+    )
+
+
+def _window_view(values: np.ndarray, window_size: int, step: int) -> np.ndarray:
+    """
+    Strided (windows x sensors x samples) view over a (samples x sensors) array.
+    Sensors are laid out contiguously once so every window shares that buffer.
+    """
+    columns = np.ascontiguousarray(values.T)
+    view = np.lib.stride_tricks.sliding_window_view(columns, window_size, axis=1)
+    return view[:, ::step].transpose(1, 0, 2)
+
+
+def _window_labels(labels: np.ndarray, window_size: int, step: int) -> np.ndarray:
+    """
+    Most frequent label per window (smallest label on ties, like Series.mode).
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(labels, window_size)[::step]
+    offset = int(labels.min())
+    n_labels = int(labels.max()) - offset + 1
+    n_windows = windows.shape[0]
+    bins = (windows - offset) + np.arange(n_windows)[:, None] * n_labels
+    counts = np.bincount(bins.ravel(), minlength=n_windows * n_labels)
+    return counts.reshape(n_windows, n_labels).argmax(axis=1) + offset
+
+
+def _batched_stats(
+    windows: np.ndarray, stats: Sequence[str]
+) -> Dict[str, np.ndarray]:
+    """
+    Compute each requested statistic for every (window, sensor) in one call.
+    """
+    out: Dict[str, np.ndarray] = {}
+    # Moments accumulate in float64 even when the samples are stored as float32.
+    if "mean" in stats:
+        out["mean"] = np.mean(windows, axis=-1, dtype=np.float64)
+    if "std" in stats:
+        out["std"] = np.std(windows, axis=-1, dtype=np.float64)
+    if "min" in stats:
+        out["min"] = np.min(windows, axis=-1)
+    if "max" in stats:
+        out["max"] = np.max(windows, axis=-1)
+    if "median" in stats or "mad" in stats:
+        median = np.median(windows, axis=-1)
+        if "median" in stats:
+            out["median"] = median
+        if "mad" in stats:
+            out["mad"] = np.median(np.abs(windows - median[..., None]), axis=-1)
+    if "energy" in stats:
+        squares = np.square(windows, dtype=np.float64)
+        out["energy"] = np.sum(squares, axis=-1) / windows.shape[-1]
+    return out
+
+
+def _sliding_extrema(
+    values: np.ndarray, window_size: int, starts: np.ndarray, op: np.ufunc
+) -> np.ndarray:
+    """
+    Van Herk/Gil-Werman running min/max: block prefix and suffix scans make
+    every window an O(1) lookup regardless of window size.
+    """
+    n_samples, n_sensors = values.shape
+    n_blocks = -(-n_samples // window_size)
+    fill = np.inf if op is np.minimum else -np.inf
+    padded = np.full((n_blocks * window_size, n_sensors), fill)
+    padded[:n_samples] = values
+    blocks = padded.reshape(n_blocks, window_size, n_sensors)
+    prefix = op.accumulate(blocks, axis=1).reshape(-1, n_sensors)
+    suffix = op.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(-1, n_sensors)
+    return op(suffix[starts], prefix[starts + window_size - 1])
+
+
+class _SlidingOrderStatistics:
+    """
+    Sorted contents of the current window for every sensor at once.
+
+    Samples are replaced by their per-sensor rank offset by ``sensor * n``, so a
+    single sorted int array holds all sensors back to back (``window_size``
+    entries each). Sliding the window sorts the samples that left and entered
+    and splices them in with a linear pass, so each step still costs
+    O(window_size) per sensor; median and MAD are then O(log window_size)
+    lookups, evaluated for a batch of window snapshots at a time.
+    """
+
+    def __init__(self, values: np.ndarray, window_size: int):
+        n_samples, n_sensors = values.shape
+        order = np.argsort(values, axis=0)
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(n_samples)[:, None], axis=0)
+        self.keys = ranks + np.arange(n_sensors) * n_samples
+        self.sorted_values = np.take_along_axis(values, order, axis=0).T.ravel()
+        self.window_size = window_size
+        self.offsets = np.arange(n_sensors) * window_size
+        self.window = np.empty(0, dtype=self.keys.dtype)
+        self.start = self.end = 0
+
+    def _move_to(self, start: int) -> None:
+        end = start + self.window_size
+        if start >= self.end:
+            self.window = np.sort(self.keys[start:end].ravel())
+        else:
+            leaving = np.sort(self.keys[self.start : start].ravel())
+            keep = np.ones(len(self.window), dtype=bool)
+            keep[np.searchsorted(self.window, leaving)] = False
+            kept = self.window[keep]
+            entering = np.sort(self.keys[self.end : end].ravel())
+            slots = np.searchsorted(kept, entering) + np.arange(len(entering))
+            merged = np.empty(len(kept) + len(entering), dtype=kept.dtype)
+            is_new = np.zeros(len(merged), dtype=bool)
+            is_new[slots] = True
+            merged[slots] = entering
+            merged[~is_new] = kept
+            self.window = merged
+        self.start, self.end = start, end
+
+    def _lookup(self, snapshots: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        keys = np.take_along_axis(snapshots, positions, axis=1)
+        return self.sorted_values[keys]
+
+    def _kth_distance(
+        self, snapshots: np.ndarray, center: np.ndarray, k: int
+    ) -> np.ndarray:
+        # The k+1 samples closest to the center are contiguous in sorted order:
+        # binary-search the block start where the left gap stops dominating.
+        last = self.window_size - 1 - k
+        lo = np.zeros(center.shape, dtype=int)
+        hi = np.full(center.shape, last + 1)
+        for _ in range(int(np.ceil(np.log2(last + 2)))):
+            mid = np.minimum((lo + hi) // 2, last)
+            left_gap = center - self._lookup(snapshots, self.offsets + mid)
+            right_gap = self._lookup(snapshots, self.offsets + mid + k) - center
+            right_wins = left_gap <= right_gap
+            active = lo < hi
+            hi = np.where(active & right_wins, mid, hi)
+            lo = np.where(active & ~right_wins, mid + 1, lo)
+        right = self._lookup(snapshots, self.offsets + np.minimum(lo, last) + k)
+        best = np.where(lo <= last, right - center, np.inf)
+        left = center - self._lookup(snapshots, self.offsets + np.maximum(lo - 1, 0))
+        return np.where(lo > 0, np.minimum(best, left), best)
+
+    def median_and_mad(
+        self, starts: np.ndarray, with_mad: bool, batch_size: int = 256
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        w = self.window_size
+        medians = np.empty((len(starts), len(self.offsets)))
+        mads = np.empty_like(medians)
+        for first in range(0, len(starts), batch_size):
+            chunk = starts[first : first + batch_size]
+            snapshots = np.empty((len(chunk), self.keys.shape[1] * w), dtype=self.keys.dtype)
+            for i, start in enumerate(chunk):
+                self._move_to(int(start))
+                snapshots[i] = self.window
+            rows = slice(first, first + len(chunk))
+            lower = self.sorted_values[snapshots[:, self.offsets + (w - 1) // 2]]
+            upper = self.sorted_values[snapshots[:, self.offsets + w // 2]]
+            medians[rows] = (lower + upper) / 2
+            if with_mad:
+                mads[rows] = (
+                    self._kth_distance(snapshots, medians[rows], (w - 1) // 2)
+                    + self._kth_distance(snapshots, medians[rows], w // 2)
+                ) / 2
+        return medians, mads
+
+
+def _rolling_stats(
+    values: np.ndarray, window_size: int, step: int, stats: Sequence[str]
+) -> Dict[str, np.ndarray]:
+    """
+    Same statistics as _batched_stats, computed so overlapping windows share
+    work: prefix sums for mean/std/energy, sliding extrema for min/max and a
+    sliding sorted window for median/mad.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_windows = (len(values) - window_size) // step + 1
+    starts = np.arange(n_windows) * step
+    out: Dict[str, np.ndarray] = {}
+
+    if {"min", "max", "std"} & set(stats):
+        lowest = _sliding_extrema(values, window_size, starts, np.minimum)
+        highest = _sliding_extrema(values, window_size, starts, np.maximum)
+        if "min" in stats:
+            out["min"] = lowest
+        if "max" in stats:
+            out["max"] = highest
+    if {"mean", "std", "energy"} & set(stats):
+        # Centre each sensor first so the running sums stay well conditioned.
+        center = values.mean(axis=0)
+        shifted = values - center
+        zero = np.zeros((1, values.shape[1]))
+        s1 = np.concatenate([zero, np.cumsum(shifted, axis=0)])
+        s2 = np.concatenate([zero, np.cumsum(shifted**2, axis=0)])
+        mean_shift = (s1[starts + window_size] - s1[starts]) / window_size
+        mean_sq_shift = (s2[starts + window_size] - s2[starts]) / window_size
+        if "mean" in stats:
+            out["mean"] = center + mean_shift
+        if "std" in stats:
+            std = np.sqrt(np.maximum(mean_sq_shift - mean_shift**2, 0.0))
+            # Flat windows would otherwise keep the sums' rounding residue.
+            out["std"] = np.where(lowest == highest, 0.0, std)
+        if "energy" in stats:
+            out["energy"] = mean_sq_shift + 2 * center * mean_shift + center**2
+    if "median" in stats or "mad" in stats:
+        order_stats = _SlidingOrderStatistics(values, window_size)
+        medians, mads = order_stats.median_and_mad(starts, with_mad="mad" in stats)
+        if "median" in stats:
+            out["median"] = medians
+        if "mad" in stats:
+            out["mad"] = mads
+    return out
+
+
+def feature_names(
+    sensor_columns: Sequence[str] = SENSOR_COLUMNS,
+    feature_stats: Sequence[str] | None = None,
+) -> List[str]:
+    """
+    Feature column order produced by create_windows/extract_features.
+    """
+    stats = feature_stats or DEFAULT_STATS
+    return [
+        f"{col}__{stat}" for col in sensor_columns for stat in DEFAULT_STATS if stat in stats
+    ]
+
+
+def window_features(
+    values: np.ndarray,
+    labels: np.ndarray,
+    window_size: int,
+    step: int,
+    stats: Sequence[str],
+    engine: str = "batched",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Feature matrix (windows x features) and label per window for one subject.
+
+    ``engine="batched"`` reduces every window independently; ``"rolling"``
+    reuses the samples shared by overlapping windows. Its mean/std/energy and
+    min/max cost follows the step, median/mad still cost O(window_size) per
+    window, so it only pays off at high overlap.
+    """
+    ordered = [s for s in DEFAULT_STATS if s in stats]
+    n_windows = (len(values) - window_size) // step + 1
+    if n_windows <= 0:
+        return np.empty((0, values.shape[1] * len(ordered))), np.empty(0, dtype=int)
+
+    features = np.empty((n_windows, values.shape[1], len(ordered)))
+    if engine == "rolling":
+        per_stat = _rolling_stats(values, window_size, step, ordered)
+        for k, stat in enumerate(ordered):
+            features[:, :, k] = per_stat[stat]
+    elif engine == "batched":
+        windows = _window_view(values, window_size, step)
+        for start in range(0, n_windows, WINDOW_BATCH):
+            batch = windows[start : start + WINDOW_BATCH]
+            per_stat = _batched_stats(batch, ordered)
+            for k, stat in enumerate(ordered):
+                features[start : start + len(batch), :, k] = per_stat[stat]
+    else:
+        raise ValueError(f"Unknown feature engine: {engine}")
+    # (windows, sensors, stats) flattened sensor-major to match feature_names.
+    return features.reshape(n_windows, -1), _window_labels(labels, window_size, step)
+
+
+def _window_tasks(
+    n_rows: int, window_size: int, step: int, task_windows: int = TASK_WINDOWS
 ) -> List[Tuple[int, int]]:
-    indices = []
-    start = 0
-    while start + window_size <= n_samples:
-        end = start + window_size
-        indices.append((start, end))
-        start += step_size
-    return indices
+    """
+    Row ranges (start, stop) of consecutive runs of at most ``task_windows``
+    windows; together they yield exactly the windows of the whole range.
+    """
+    n_windows = (n_rows - window_size) // step + 1
+    return [
+        (first * step, (min(first + task_windows, n_windows) - 1) * step + window_size)
+        for first in range(0, n_windows, task_windows)
+    ]
+
+
+def _shared_window_task(spec: tuple) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Process-pool worker: window one row range of the shared sensor/label arrays.
+    """
+    (
+        values_name,
+        labels_name,
+        shape,
+        values_dtype,
+        labels_dtype,
+        start,
+        stop,
+        window_size,
+        step,
+        stats,
+        engine,
+    ) = spec
+    values_shm = shared_memory.SharedMemory(name=values_name)
+    labels_shm = shared_memory.SharedMemory(name=labels_name)
+    try:
+        values = np.ndarray(shape, dtype=values_dtype, buffer=values_shm.buf)
+        labels = np.ndarray(shape[:1], dtype=labels_dtype, buffer=labels_shm.buf)
+        X, y = window_features(
+            values[start:stop], labels[start:stop], window_size, step, stats, engine=engine
+        )
+        del values, labels
+        return X, y
+    finally:
+        values_shm.close()
+        labels_shm.close()
+
+
+def _gather_rows(
+    sensors: List[np.ndarray], idx: np.ndarray, out: np.ndarray
+) -> np.ndarray:
+    """
+    Fill ``out`` (rows x sensors) with the ``idx`` rows of per-sensor columns.
+    """
+    for j, column in enumerate(sensors):
+        out[:, j] = column[idx]
+    return out
+
+
+def _parallel_window_features(
+    sensors: List[np.ndarray],
+    labels: np.ndarray,
+    positions: List[np.ndarray],
+    tasks: List[Tuple[int, int, int]],
+    window_size: int,
+    step: int,
+    stats: Sequence[str],
+    engine: str,
+    workers: int,
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Run window tasks on a process pool. Subject rows are gathered once into
+    shared memory and workers read them in place; results come back in task
+    order.
+    """
+    offsets = np.concatenate([[0], np.cumsum([len(idx) for idx in positions])])
+    shape = (int(offsets[-1]), len(sensors))
+    values_dtype = np.result_type(*sensors)
+    labels_dtype = labels.dtype
+
+    values_shm = shared_memory.SharedMemory(
+        create=True, size=max(1, shape[0] * shape[1] * values_dtype.itemsize)
+    )
+    labels_shm = shared_memory.SharedMemory(
+        create=True, size=max(1, shape[0] * labels_dtype.itemsize)
+    )
+    try:
+        values = np.ndarray(shape, dtype=values_dtype, buffer=values_shm.buf)
+        shared_labels = np.ndarray(shape[:1], dtype=labels_dtype, buffer=labels_shm.buf)
+        for idx, start, stop in zip(positions, offsets[:-1], offsets[1:]):
+            _gather_rows(sensors, idx, values[start:stop])
+            shared_labels[start:stop] = labels[idx]
+        del values, shared_labels
+
+        specs = [
+            (
+                values_shm.name,
+                labels_shm.name,
+                shape,
+                values_dtype.str,
+                labels_dtype.str,
+                int(offsets[part] + start),
+                int(offsets[part] + stop),
+                window_size,
+                step,
+                list(stats),
+                engine,
+            )
+            for part, start, stop in tasks
+        ]
+        with ProcessPoolExecutor(max_workers=min(workers, len(specs))) as executor:
+            return list(executor.map(_shared_window_task, specs))
+    finally:
+        values_shm.close()
+        values_shm.unlink()
+        labels_shm.close()
+        labels_shm.unlink()
 
 
 def create_windows(
@@ -68,33 +502,97 @@ def create_windows(
     overlap_seconds: float,
     sample_rate_hz: int,
     feature_stats: Sequence[str] | None = None,
+    engine: str = "batched",
+    workers: int = 1,
+    rows: RowIndex | None = None,
 ) -> pd.DataFrame:
+    """
+    Window every subject of ``df`` into one feature row per window.
+
+    ``rows`` (from subject_rows/split_rows) restricts windowing to those row
+    positions, so filtered or split data never needs its own frame. With
+    ``workers`` > 1 the windows are computed on a process pool; output is
+    identical to the serial path and always ordered by subject, then time.
+    """
     window_size = int(window_seconds * sample_rate_hz)
     overlap = int(overlap_seconds * sample_rate_hz)
     step = max(1, window_size - overlap)
-    rows: List[dict] = []
-
-    for subject_id, group in df.groupby(df[SUBJECT_COLUMN]):
-        group = group.sort_values("timestamp")
-        idxs = _window_indices(len(group), window_size, step)
-        for start, end in idxs:
-            window = group.iloc[start:end]
-            label_mode = window[LABEL_COLUMN].mode()
-            label = int(label_mode.iloc[0]) if not label_mode.empty else None
-            feature_row = extract_features(
-                window[SENSOR_COLUMNS], feature_stats=feature_stats
+    stats = feature_stats or DEFAULT_STATS
+    columns = feature_names(SENSOR_COLUMNS, stats)
+
+    if rows is None:
+        rows = subject_rows(df)
+    timestamps = (
+        df[TIMESTAMP_COLUMN].to_numpy() if TIMESTAMP_COLUMN in df.columns else None
+    )
+    subject_ids: List[int] = []
+    positions: List[np.ndarray] = []
+    for subject_id in sorted(rows):
+        idx = rows[subject_id]
+        if len(idx) < window_size:
+            continue
+        if timestamps is not None:
+            idx = idx[np.argsort(timestamps[idx], kind="stable")]
+        subject_ids.append(subject_id)
+        positions.append(idx)
+
+    if not positions:
+        return pd.DataFrame(columns=columns + [LABEL_COLUMN, SUBJECT_COLUMN])
+
+    with stage(
+        "create_windows",
+        subjects=len(positions),
+        rows=int(sum(len(idx) for idx in positions)),
+        workers=workers,
+    ) as info:
+        # Column views into df; rows are gathered one subject at a time.
+        sensors = [df[col].to_numpy() for col in SENSOR_COLUMNS]
+        labels = df[LABEL_COLUMN].to_numpy()
+        tasks = [
+            (part, start, stop)
+            for part, idx in enumerate(positions)
+            for start, stop in _window_tasks(len(idx), window_size, step)
+        ]
+        if workers > 1 and len(tasks) > 1:
+            results = _parallel_window_features(
+                sensors, labels, positions, tasks, window_size, step, stats, engine, workers
             )
-            feature_row[LABEL_COLUMN] = label
-            feature_row[SUBJECT_COLUMN] = subject_id
-            rows.append(feature_row)
+        else:
+            results = []
+            values_dtype = np.result_type(*sensors)
+            for idx in positions:
+                values = _gather_rows(
+                    sensors, idx, np.empty((len(idx), len(sensors)), dtype=values_dtype)
+                )
+                subject_labels = labels[idx]
+                for start, stop in _window_tasks(len(idx), window_size, step):
+                    results.append(
+                        window_features(
+                            values[start:stop],
+                            subject_labels[start:stop],
+                            window_size,
+                            step,
+                            stats,
+                            engine=engine,
+                        )
+                    )
 
-    return pd.DataFrame(rows)
+        result = pd.DataFrame(np.concatenate([X for X, _ in results]), columns=columns)
+        result[LABEL_COLUMN] = np.concatenate([y for _, y in results]).astype(int)
+        result[SUBJECT_COLUMN] = np.concatenate(
+            [
+                np.full(len(y), subject_ids[part])
+                for (part, _, _), (_, y) in zip(tasks, results)
+            ]
+        )
+        info["windows"] = len(result)
+    return result
 
 
 def extract_features(
     window_df: pd.DataFrame, feature_stats: Sequence[str] | None = None
 ) -> Dict[str, float]:
-    stats = feature_stats or ["mean", "std", "min", "max", "median", "mad", "energy"]
+    stats = feature_stats or DEFAULT_STATS
     features: Dict[str, float] = {}
     for col in window_df.columns:
         values = window_df[col].values
@@ -129,6 +627,8 @@ def build_feature_matrix(
 
 
 def fit_scaler(train_features: pd.DataFrame) -> StandardScaler:
+    from sklearn.preprocessing import StandardScaler
+
     scaler = StandardScaler()
     scaler.fit(train_features)
     return scaler
@@ -0,0 +1,120 @@
+"""
+Per-stage wall time, CPU time and peak memory of the training pipeline.
+"""
+from __future__ import annotations
+
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; memory figures become None.
+    resource = None
+
+from .utils import save_json
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    High-water mark of this process's resident memory, in MB.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def _children_cpu_seconds() -> float:
+    """
+    CPU time of finished child processes (process pools), user + system.
+    """
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class Profiler:
+    """
+    Records stages opened with ``stage``. Nested stages are named by their
+    path (``train/fit``) and listed in the order they started.
+
+    ``peak_rss_mb`` is the process high-water mark when the stage ended and
+    ``peak_rss_growth_mb`` how much the stage raised it, so the stage that
+    sets the training memory peak is the one with the largest growth.
+    """
+
+    def __init__(self) -> None:
+        self.stages: List[Dict[str, object]] = []
+        self._path: List[str] = []
+        self._started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    @contextmanager
+    def stage(self, name: str, **counts: object) -> Iterator[Dict[str, object]]:
+        """
+        Time the enclosed block. The yielded dict is stored with the stage, so
+        the block can add row/window counts known only at the end.
+        """
+        self._path.append(name)
+        record: Dict[str, object] = {"stage": "/".join(self._path), **counts}
+        self.stages.append(record)
+        peak_before = peak_rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        children_cpu = _children_cpu_seconds()
+        try:
+            yield record
+        finally:
+            record["wall_seconds"] = time.perf_counter() - wall
+            record["cpu_seconds"] = time.process_time() - cpu
+            record["children_cpu_seconds"] = _children_cpu_seconds() - children_cpu
+            peak = peak_rss_mb()
+            record["peak_rss_mb"] = peak
+            record["peak_rss_growth_mb"] = (
+                None if peak is None else peak - peak_before
+            )
+            self._path.pop()
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "started_at": self.started_at,
+            "wall_seconds": time.perf_counter() - self._started,
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": self.stages,
+        }
+
+    def save(self, path, **extra: object) -> None:
+        save_json(path, {**extra, **self.summary()})
+
+
+_ACTIVE: List[Profiler] = []
+
+
+@contextmanager
+def profile() -> Iterator[Profiler]:
+    """
+    Make a new Profiler the target of ``stage`` calls inside the block.
+    """
+    profiler = Profiler()
+    _ACTIVE.append(profiler)
+    try:
+        yield profiler
+    finally:
+        _ACTIVE.remove(profiler)
+
+
+@contextmanager
+def stage(name: str, **counts: object) -> Iterator[Dict[str, object]]:
+    """
+    Stage of the active profiler. Without one it only yields a scratch dict,
+    so library code can be instrumented unconditionally.
+    """
+    if not _ACTIVE:
+        yield dict(counts)
+        return
+    with _ACTIVE[-1].stage(name, **counts) as record:
+        yield record
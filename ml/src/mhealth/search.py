@@ -0,0 +1,286 @@
+"""
+Budgeted successive-halving search over the RandomForest pipeline and the
+window settings, scored on the subject-level validation split.
+"""
+from __future__ import annotations
+
+import dataclasses
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, f1_score
+
+from .config import Config
+from .constants import SUBJECT_COLUMN
+from .modeling import build_pipeline, measure_latency, model_footprint
+from .preprocess import build_feature_matrix, split_subjects
+
+# Used for every dimension config.search leaves out.
+SEARCH_SPACE: Dict[str, list] = {
+    "n_estimators": [50, 100, 200, 400],
+    "max_depth": [None, 10, 20],
+    "min_samples_leaf": [1, 2, 4],
+    "max_features": ["sqrt", 0.3],
+    "window_seconds": [2.0, 5.0],
+    "window_overlap_ratio": [0.0, 0.5],
+}
+
+WINDOW_PARAMS = ("window_seconds", "window_overlap_ratio")
+
+WindowSource = Callable[[Config], pd.DataFrame]
+
+# Per-worker matrices, set once by _init_worker instead of pickled per trial.
+_MATRICES: Dict[Tuple[float, float], Tuple[np.ndarray, ...]] = {}
+
+
+def search_space(config: Config) -> Dict[str, list]:
+    space = dict(SEARCH_SPACE)
+    space.update({k: list(v) for k, v in config.search.items()})
+    return space
+
+
+def sample_trials(space: Dict[str, list], n_trials: int, seed: int) -> List[Dict[str, object]]:
+    """
+    ``n_trials`` distinct random points of the grid (fewer if the grid is smaller).
+    """
+    rng = np.random.default_rng(seed)
+    keys = sorted(space)
+    sizes = [len(space[k]) for k in keys]
+    total = int(np.prod(sizes))
+    picks = rng.choice(total, size=min(n_trials, total), replace=False)
+    trials = []
+    for pick in picks:
+        point, rest = {}, int(pick)
+        for key, size in zip(keys, sizes):
+            point[key] = space[key][rest % size]
+            rest //= size
+        trials.append(point)
+    return trials
+
+
+def _window_key(params: Dict[str, object]) -> Tuple[float, float]:
+    seconds = float(params["window_seconds"])
+    return seconds, round(seconds * float(params["window_overlap_ratio"]), 6)
+
+
+def _init_worker(matrices: Dict[Tuple[float, float], Tuple[np.ndarray, ...]]) -> None:
+    _MATRICES.clear()
+    _MATRICES.update(matrices)
+
+
+def _fit_trial(
+    params: Dict[str, object],
+    fraction: float,
+    config: Config,
+    matrices: Dict[Tuple[float, float], Tuple[np.ndarray, ...]],
+):
+    """
+    Pipeline for one configuration fitted on ``fraction`` of its training
+    windows (deterministic, so a refit reproduces the trial's model).
+    """
+    X_train, y_train, _, _, order = matrices[_window_key(params)]
+    n_rows = max(1, int(round(fraction * len(order))))
+    rows = np.sort(order[:n_rows])
+    clf_params = {k: v for k, v in params.items() if k not in WINDOW_PARAMS}
+    pipeline = build_pipeline(config, n_jobs=1, **clf_params)
+    pipeline.fit(X_train[rows], y_train[rows])
+    return pipeline, n_rows
+
+
+def _run_trial(
+    trial_id: int,
+    params: Dict[str, object],
+    fraction: float,
+    config: Config,
+) -> Dict[str, object]:
+    """
+    Fit one configuration on ``fraction`` of its training windows and score it
+    on the validation windows. Only the scores go back to the parent; the
+    fitted forest is dropped here instead of being pickled across processes.
+    """
+    start = time.perf_counter()
+    pipeline, n_rows = _fit_trial(params, fraction, config, _MATRICES)
+    _, _, X_val, y_val, _ = _MATRICES[_window_key(params)]
+    preds = pipeline.predict(X_val)
+    return {
+        "trial": trial_id,
+        "fraction": fraction,
+        "n_train_windows": int(n_rows),
+        "accuracy": accuracy_score(y_val, preds),
+        "macro_f1": f1_score(y_val, preds, average="macro"),
+        "fit_seconds": time.perf_counter() - start,
+    }
+
+
+def _matrices(
+    config: Config,
+    trials: List[Dict[str, object]],
+    window_source: WindowSource,
+) -> Tuple[Dict[Tuple[float, float], Tuple[np.ndarray, ...]], Dict[str, List[int]]]:
+    """
+    Train/val matrices for every window setting used by ``trials``. Each
+    setting also gets a fixed row permutation so every trial of a rung trains
+    on the same subsample.
+    """
+    matrices = {}
+    splits: Dict[str, List[int]] = {}
+    for key in sorted({_window_key(t) for t in trials}):
+        variant = dataclasses.replace(
+            config, window_seconds=key[0], window_overlap_seconds=key[1]
+        )
+        windows = window_source(variant)
+        train_subj, val_subj, _ = split_subjects(windows[SUBJECT_COLUMN].unique(), config)
+        splits = {
+            "train_subjects": sorted(int(s) for s in train_subj),
+            "val_subjects": sorted(int(s) for s in val_subj),
+        }
+        subject_col = windows[SUBJECT_COLUMN]
+        X_train, y_train = build_feature_matrix(windows[subject_col.isin(train_subj)])
+        X_val, y_val = build_feature_matrix(windows[subject_col.isin(val_subj)])
+        order = np.random.default_rng(config.random_seed).permutation(len(X_train))
+        matrices[key] = (
+            X_train.to_numpy(),
+            y_train.to_numpy(),
+            X_val.to_numpy(),
+            y_val.to_numpy(),
+            order,
+        )
+    return matrices, splits
+
+
+def pareto_frontier(candidates: List[Dict[str, object]]) -> List[Dict[str, object]]:
+    """
+    Candidates not dominated on (higher macro_f1, lower latency, smaller model).
+    """
+
+    def dominates(a: Dict[str, object], b: Dict[str, object]) -> bool:
+        no_worse = (
+            a["macro_f1"] >= b["macro_f1"]
+            and a["latency_ms"] <= b["latency_ms"]
+            and a["model_bytes"] <= b["model_bytes"]
+        )
+        better = (
+            a["macro_f1"] > b["macro_f1"]
+            or a["latency_ms"] < b["latency_ms"]
+            or a["model_bytes"] < b["model_bytes"]
+        )
+        return no_worse and better
+
+    frontier = [c for c in candidates if not any(dominates(o, c) for o in candidates)]
+    return sorted(frontier, key=lambda c: (-c["macro_f1"], c["latency_ms"]))
+
+
+def successive_halving(
+    config: Config,
+    window_source: WindowSource,
+    budget_seconds: float,
+    n_trials: int = 27,
+    eta: int = 3,
+    n_jobs: int = 1,
+) -> Dict[str, object]:
+    """
+    Successive halving: every sampled configuration is trained on a small
+    fraction of the training windows, the best 1/``eta`` advance to an
+    ``eta`` times larger fraction, up to the full training split.
+
+    Trials run on a pool of ``n_jobs`` processes. Once ``budget_seconds`` is
+    spent, trials not yet started are cancelled and the search stops after the
+    running ones finish; the frontier is built from the last rung reached.
+    ``search_seconds`` covers the trials only; ``elapsed_seconds`` adds the
+    refit and latency/size measurements of the final candidates.
+    """
+    started = time.perf_counter()
+    deadline = started + budget_seconds
+    space = search_space(config)
+    trials = sample_trials(space, n_trials, config.random_seed)
+    matrices, splits = _matrices(config, trials, window_source)
+
+    # The full-data rung keeps about ``eta`` configurations for the frontier.
+    n_rungs = max(1, int(math.floor(math.log(len(trials), eta) + 1e-9)))
+    fractions = [eta ** (k - n_rungs + 1) for k in range(n_rungs)]
+
+    alive = list(range(len(trials)))
+    rungs: List[Dict[str, object]] = []
+    last_results: List[Dict[str, object]] = []
+    exhausted = False
+    with ProcessPoolExecutor(
+        max_workers=max(1, n_jobs), initializer=_init_worker, initargs=(matrices,)
+    ) as executor:
+        for fraction in fractions:
+            if time.perf_counter() >= deadline:
+                exhausted = True
+                break
+            pending = {
+                executor.submit(_run_trial, t, trials[t], fraction, config) for t in alive
+            }
+            results: List[Dict[str, object]] = []
+            while pending:
+                done, pending = wait(
+                    pending,
+                    timeout=max(0.0, deadline - time.perf_counter()),
+                    return_when=FIRST_COMPLETED,
+                )
+                results.extend(f.result() for f in done)
+                if pending and time.perf_counter() >= deadline:
+                    exhausted = True
+                    for future in pending:
+                        future.cancel()
+                    results.extend(
+                        f.result() for f in pending if not f.cancelled()
+                    )
+                    break
+            if not results:
+                break
+
+            results.sort(key=lambda r: (-r["macro_f1"], -r["accuracy"], r["trial"]))
+            rungs.append(
+                {
+                    "fraction": fraction,
+                    "trials": results,
+                }
+            )
+            last_results = results
+            if exhausted:
+                break
+            alive = [r["trial"] for r in results[: max(1, math.ceil(len(results) / eta))]]
+
+    search_seconds = time.perf_counter() - started
+
+    # Only the last rung's survivors are refitted, here, one model at a time,
+    # so latency and size are not skewed by trials running in parallel.
+    candidates = []
+    for result in last_results:
+        params = trials[result["trial"]]
+        X_val = matrices[_window_key(params)][2]
+        pipeline, _ = _fit_trial(params, result["fraction"], config, matrices)
+        candidate = {
+            "trial": result["trial"],
+            "params": params,
+            "fraction": result["fraction"],
+            "accuracy": result["accuracy"],
+            "macro_f1": result["macro_f1"],
+        }
+        candidate.update(measure_latency(pipeline, X_val))
+        candidate.update(model_footprint(pipeline))
+        candidates.append(candidate)
+
+    frontier = pareto_frontier(candidates) if candidates else []
+    return {
+        "method": "successive_halving",
+        "eta": eta,
+        "budget_seconds": budget_seconds,
+        "search_seconds": search_seconds,
+        "elapsed_seconds": time.perf_counter() - started,
+        "budget_exhausted": exhausted,
+        "space": space,
+        "splits": splits,
+        "trials": [{"trial": i, "params": p} for i, p in enumerate(trials)],
+        "rungs": rungs,
+        "candidates": candidates,
+        "frontier": frontier,
+        "best": frontier[0] if frontier else None,
+    }
@@ -0,0 +1,30 @@
+import pathlib
+import sys
+
+import numpy as np
+import pytest
+
+ML_DIR = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(ML_DIR / "src"))
+
+from mhealth.config import load_config  # noqa: E402
+from mhealth.constants import SENSOR_COLUMNS  # noqa: E402
+
+
+def write_log(path: pathlib.Path, n_rows: int = 3000, seed: int = 0) -> pathlib.Path:
+    """
+    Synthetic mHealth log: 23 tab-separated sensor columns plus an activity
+    label that changes every 500 rows (0 = null class), like the real files.
+    """
+    rng = np.random.default_rng(seed)
+    sensors = rng.normal(size=(n_rows, len(SENSOR_COLUMNS))).round(6)
+    activity = (np.arange(n_rows) // 500) % 5
+    with open(path, "w", encoding="utf-8") as f:
+        for row, label in zip(sensors, activity):
+            f.write("\t".join(f"{v:.6f}" for v in row) + f"\t{label}\n")
+    return path
+
+
+@pytest.fixture
+def config():
+    return load_config(ML_DIR.parent / "config" / "config.yaml")
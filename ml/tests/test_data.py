@@ -0,0 +1,154 @@
+import hashlib
+import io
+import os
+import pathlib
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from conftest import write_log
+
+from mhealth import data
+
+
+def make_zip() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr("MHEALTHDATASET/mHealth_subject1.log", "0.1\t" * 23 + "1\n" * 5000)
+    return buffer.getvalue()
+
+
+PAYLOAD = make_zip()
+
+
+class ZipHandler(BaseHTTPRequestHandler):
+    ranges = True
+    requests = []
+
+    def do_GET(self):
+        range_header = self.headers.get("Range")
+        type(self).requests.append(range_header)
+        if range_header and self.ranges:
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+            if start >= len(PAYLOAD):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(PAYLOAD)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = PAYLOAD[start:]
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}"
+            )
+        else:
+            body = PAYLOAD
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(data, "RAW_DIR", tmp_path)
+    ZipHandler.ranges = True
+    ZipHandler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ZipHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/mhealth.zip"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def part_file(tmp_path, content: bytes) -> pathlib.Path:
+    path = tmp_path / "mhealth_dataset.zip.part"
+    path.write_bytes(content)
+    return path
+
+
+def test_fetch_dataset_resumes_partial_download(server, tmp_path):
+    part = part_file(tmp_path, PAYLOAD[: len(PAYLOAD) // 3])
+    zip_path = data.fetch_dataset(server)
+    assert ZipHandler.requests == [f"bytes={len(PAYLOAD) // 3}-"]
+    assert zip_path.read_bytes() == PAYLOAD
+    assert not part.exists()
+
+
+def test_fetch_dataset_restarts_without_range_support(server, tmp_path):
+    ZipHandler.ranges = False
+    part_file(tmp_path, PAYLOAD[:100])
+    zip_path = data.fetch_dataset(server)
+    assert zip_path.read_bytes() == PAYLOAD
+
+
+def test_fetch_dataset_complete_part_gets_416(server, tmp_path):
+    part_file(tmp_path, PAYLOAD)
+    zip_path = data.fetch_dataset(server)
+    assert ZipHandler.requests == [f"bytes={len(PAYLOAD)}-"]
+    assert zip_path.read_bytes() == PAYLOAD
+
+
+def test_fetch_dataset_stale_part_restarts_after_416(server, tmp_path):
+    part_file(tmp_path, b"x" * (len(PAYLOAD) + 10))
+    zip_path = data.fetch_dataset(server)
+    assert ZipHandler.requests == [f"bytes={len(PAYLOAD) + 10}-", None]
+    assert zip_path.read_bytes() == PAYLOAD
+
+
+def test_fetch_dataset_rejects_sha256_mismatch(server, tmp_path):
+    with pytest.raises(ValueError, match="SHA-256"):
+        data.fetch_dataset(server, sha256="0" * 64)
+    assert not (tmp_path / "mhealth_dataset.zip").exists()
+    assert not (tmp_path / "mhealth_dataset.zip.part").exists()
+
+    expected = hashlib.sha256(PAYLOAD).hexdigest()
+    assert data.fetch_dataset(server, sha256=expected).read_bytes() == PAYLOAD
+
+
+def test_warm_load_hits_parse_cache_without_hashing(config, tmp_path, monkeypatch):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    monkeypatch.setattr(data, "RAW_DIR", raw)
+    monkeypatch.setattr(data, "PARSED_CACHE_DIR", tmp_path / "cache")
+    logs = tmp_path / "src"
+    logs.mkdir()
+    with zipfile.ZipFile(raw / "mhealth_dataset.zip", "w") as zf:
+        for subject in (1, 2):
+            log = write_log(logs / f"mHealth_subject{subject}.log", 600, seed=subject)
+            zf.write(log, f"MHEALTHDATASET/{log.name}")
+    hashed, parsed = [], []
+    monkeypatch.setattr(
+        data, "_file_sha256", lambda p, f=data._file_sha256: hashed.append(p) or f(p)
+    )
+    monkeypatch.setattr(
+        data, "_parse_subject_log", lambda s, f=data._parse_subject_log: parsed.append(s) or f(s)
+    )
+
+    cold = data.MHealthDataset(config).subjects([1, 2])
+    assert len(parsed) == 2
+    log1 = raw / "MHEALTHDATASET" / "mHealth_subject1.log"
+    mtime = log1.stat().st_mtime_ns
+
+    hashed.clear(), parsed.clear()
+    warm = data.MHealthDataset(config).subjects([1, 2])
+    assert log1.stat().st_mtime_ns == mtime  # not re-extracted
+    assert hashed == [] and parsed == []
+    assert warm.equals(cold)
+
+    # Touched but identical: hashed once, still served from the cache.
+    os.utime(log1, ns=(mtime + 10**9, mtime + 10**9))
+    data.MHealthDataset(config).subject(1)
+    assert hashed == [log1] and parsed == []
+
+    # Edited: re-parsed.
+    with open(log1, "a", encoding="utf-8") as f:
+        f.write("\t".join(["0.5"] * 23) + "\t3\n")
+    edited = data.MHealthDataset(config).subject(1)
+    assert parsed == [log1]
+    assert len(edited) == 601
@@ -0,0 +1,41 @@
+import dataclasses
+
+import numpy as np
+from conftest import write_log
+
+from mhealth import data
+from mhealth.data import MHealthDataset
+from mhealth.feature_store import FeatureStore
+
+
+def test_compact_dtypes_get_their_own_blocks(config, tmp_path, monkeypatch):
+    monkeypatch.setattr(data, "PARSED_CACHE_DIR", tmp_path / "cache")
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    for subject in (1, 2):
+        write_log(logs / f"mHealth_subject{subject}.log", 1500, seed=subject)
+    computed = []
+    compute = FeatureStore._compute
+    monkeypatch.setattr(
+        FeatureStore, "_compute", lambda self, ds, ids: computed.append(ids) or compute(self, ds, ids)
+    )
+
+    def windows(cfg):
+        return FeatureStore(cfg, root=tmp_path / "store").windows(
+            MHealthDataset(cfg, dataset_dir=logs), [1, 2]
+        )
+
+    full = windows(config)
+    assert windows(config).equals(full)
+    assert computed == [[1, 2]]
+
+    compact_config = dataclasses.replace(
+        config, data=dataclasses.replace(config.data, compact_dtypes=True)
+    )
+    compact = windows(compact_config)
+    assert computed == [[1, 2], [1, 2]]
+    assert len(list((tmp_path / "store").glob("*.npz"))) == 4
+    features = [c for c in full.columns if "__" in c]
+    np.testing.assert_allclose(compact[features], full[features], atol=1e-5)
+    assert windows(compact_config).equals(compact)
+    assert len(computed) == 2
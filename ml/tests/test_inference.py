@@ -0,0 +1,172 @@
+import dataclasses
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import ML_DIR, write_log
+
+from mhealth.config import load_config
+from mhealth.constants import LABEL_COLUMN, SENSOR_COLUMNS, SUBJECT_COLUMN
+from mhealth.data import load_subject_log
+from mhealth.inference import (
+    ArrayForest,
+    StreamingPredictor,
+    ensure_feature_order,
+    export_forest,
+    export_forest_memmap,
+    load_model,
+    predict_log_stream,
+    predict_windows,
+    predict_windows_columnar,
+    prepare_features_from_log,
+)
+from mhealth.parsing import read_log
+from mhealth.modeling import build_pipeline
+from mhealth.preprocess import create_windows, window_features
+
+
+@pytest.fixture(scope="module")
+def small_config():
+    config = load_config(ML_DIR.parent / "config" / "config.yaml")
+    # 100-row windows every 40 rows, 20 shallow trees: fast but not trivial.
+    return dataclasses.replace(
+        config,
+        window_seconds=2.0,
+        window_overlap_seconds=1.2,
+        model=dataclasses.replace(config.model, n_estimators=20, max_depth=8),
+    )
+
+
+@pytest.fixture(scope="module")
+def fitted(small_config, tmp_path_factory):
+    log = write_log(tmp_path_factory.mktemp("logs") / "mHealth_subject1.log", 4000)
+    windows = create_windows(load_subject_log(log, 1, 50, cache_dir=None), 2.0, 1.2, 50)
+    X = windows.drop(columns=[LABEL_COLUMN, SUBJECT_COLUMN])
+    pipeline = build_pipeline(small_config, n_jobs=1)
+    pipeline.fit(X, windows[LABEL_COLUMN])
+    return pipeline, list(X.columns), log
+
+
+def random_windows(pipeline, columns, n=500, seed=1):
+    # Spread around the training distribution, as export_model.py checks.
+    scaler = pipeline.named_steps["scaler"]
+    rng = np.random.default_rng(seed)
+    X = scaler.mean_ + rng.normal(size=(n, len(columns))) * scaler.scale_ * 2
+    return pd.DataFrame(X, columns=columns)
+
+
+def test_array_forest_matches_sklearn_exactly(fitted, tmp_path):
+    pipeline, columns, _ = fitted
+    forest = ArrayForest.load(export_forest(pipeline, tmp_path / "forest.npz", columns))
+    X = random_windows(pipeline, columns)
+    np.testing.assert_array_equal(forest.predict_proba(X.to_numpy()), pipeline.predict_proba(X))
+    np.testing.assert_array_equal(forest.predict(X.to_numpy()), pipeline.predict(X))
+    assert forest.feature_columns == columns
+
+
+def test_inference_import_does_not_load_sklearn():
+    code = (
+        f"import sys; sys.path.insert(0, {str(ML_DIR / 'src')!r}); import mhealth.inference; "
+        "sys.exit(any(m.split('.')[0] == 'sklearn' for m in sys.modules))"
+    )
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+def test_memmap_export_reproduces_sklearn_exactly(fitted, tmp_path):
+    pipeline, columns, _ = fitted
+    forest = load_model(export_forest_memmap(pipeline, tmp_path / "memmap", columns))
+    assert isinstance(forest.threshold, np.memmap)
+    assert forest.threshold.dtype == np.float32
+    X = random_windows(pipeline, columns)
+    np.testing.assert_array_equal(forest.predict_proba(X.to_numpy()), pipeline.predict_proba(X))
+
+
+@pytest.mark.parametrize("leaf_bits", [8, 16])
+def test_quantized_leaves_stay_within_rounding_error(fitted, tmp_path, leaf_bits):
+    pipeline, columns, _ = fitted
+    forest = ArrayForest.load(
+        export_forest_memmap(pipeline, tmp_path / "memmap", columns, leaf_bits=leaf_bits)
+    )
+    X = random_windows(pipeline, columns)
+    # Each leaf is rounded to the nearest 1/(2**bits - 1); the tree average
+    # can be off by at most half of that step.
+    tolerance = 0.5 / (2**leaf_bits - 1)
+    delta = np.abs(forest.predict_proba(X.to_numpy()) - pipeline.predict_proba(X))
+    assert delta.max() <= tolerance + 1e-12
+
+
+# Log lines are ~220 bytes and windows 100 rows (step 40): blocks of a couple
+# of rows, under one window, not aligned to the step, and the whole file.
+@pytest.mark.parametrize("chunk_bytes", [500, 7001, 30011, 10**7])
+def test_log_stream_matches_batch_path(fitted, small_config, chunk_bytes):
+    pipeline, columns, log = fitted
+    windows = prepare_features_from_log(log, small_config)
+    expected = pipeline.predict_proba(
+        ensure_feature_order(windows.drop(columns=[LABEL_COLUMN, SUBJECT_COLUMN]), columns)
+    )
+
+    chunks = list(predict_log_stream(pipeline, log, small_config, columns, chunk_bytes))
+    np.testing.assert_array_equal(np.concatenate([c["proba"] for c in chunks]), expected)
+    np.testing.assert_array_equal(
+        np.concatenate([c["labels"] for c in chunks]), windows[LABEL_COLUMN]
+    )
+    np.testing.assert_array_equal(
+        np.concatenate([c["window_index"] for c in chunks]), np.arange(len(expected))
+    )
+
+
+@pytest.mark.parametrize("push_size", [1, 37, 99, 100, 1000])
+def test_streaming_predictor_matches_batch_windows(fitted, small_config, push_size):
+    pipeline, columns, log = fitted
+    values = read_log(log)[:, : len(SENSOR_COLUMNS)]
+    X, _ = window_features(
+        values, np.full(len(values), -1), 100, 40, small_config.features["stats"]
+    )
+    expected = pipeline.predict_proba(pd.DataFrame(X, columns=columns))
+
+    predictor = StreamingPredictor(pipeline, columns, small_config)
+    results = []
+    for start in range(0, len(values), push_size):
+        results.extend(predictor.push(values[start : start + push_size]))
+    assert [r["window_index"] for r in results] == list(range(len(expected)))
+    assert [r["start_seconds"] for r in results] == [i * 40 / 50 for i in range(len(expected))]
+    np.testing.assert_array_equal(
+        [list(r["proba"].values()) for r in results], expected
+    )
+    assert [r["prediction"] for r in results] == list(
+        pipeline.classes_.take(expected.argmax(axis=1))
+    )
+
+
+@pytest.mark.parametrize(
+    "encoding, tolerance", [("float", 0.0), ("float16", 3e-4), ("uint8", 0.5 / 255)]
+)
+def test_columnar_predictions_encodings(fitted, encoding, tolerance):
+    pipeline, columns, _ = fitted
+    X = random_windows(pipeline, columns, n=200)
+    reference = predict_windows(pipeline, X.copy(), columns)
+    expected = pipeline.predict_proba(X)
+
+    result = predict_windows_columnar(pipeline, X.copy(), columns, proba_encoding=encoding)
+    assert result["n_windows"] == len(X)
+    assert result["classes"] == [int(c) for c in pipeline.classes_]
+    assert [result["activities"][i] for i in result["predictions"]] == [
+        w["activity"] for w in reference["per_window"]
+    ]
+    assert result["aggregate"] == reference["aggregate"]
+
+    proba = np.array(result["proba"])
+    if encoding == "uint8":
+        assert result["proba_scale"] == 255
+        assert proba.dtype.kind == "i" and proba.min() >= 0 and proba.max() <= 255
+    else:
+        assert result["proba_scale"] == 1
+    assert np.abs(proba / result["proba_scale"] - expected).max() <= tolerance
+
+
+def test_columnar_rejects_unknown_encoding(fitted):
+    pipeline, columns, _ = fitted
+    with pytest.raises(ValueError, match="proba encoding"):
+        predict_windows_columnar(pipeline, random_windows(pipeline, columns, n=5), columns, "int4")
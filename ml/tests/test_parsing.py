@@ -0,0 +1,44 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import write_log
+
+from mhealth.parsing import iter_log_blocks, read_log
+
+
+def pandas_reader(path):
+    # The reader read_log replaced.
+    return pd.read_csv(path, sep=r"\s+", header=None).to_numpy(dtype=np.float64)
+
+
+def test_read_log_matches_pandas(tmp_path):
+    log = write_log(tmp_path / "mHealth_subject1.log", 2500)
+    expected = pandas_reader(log)
+    assert expected.shape == (2500, 24)
+    np.testing.assert_array_equal(read_log(log), expected)
+    np.testing.assert_array_equal(read_log(io.BytesIO(log.read_bytes())), expected)
+    np.testing.assert_array_equal(
+        np.concatenate(list(iter_log_blocks(log, chunk_bytes=3001))), expected
+    )
+
+
+def test_read_log_accepts_unlabeled_logs(tmp_path):
+    log = tmp_path / "live.log"
+    log.write_text("0.5 1.5\t-2 " + " ".join(["3"] * 20) + "\n" + "1 " * 23 + "\n")
+    values = read_log(log)
+    assert values.shape == (2, 23)
+    np.testing.assert_array_equal(values, pandas_reader(log))
+
+
+def test_read_log_rejects_wrong_column_counts(tmp_path):
+    log = tmp_path / "bad.log"
+    log.write_text("1 2 3\n")
+    with pytest.raises(ValueError, match="23 or 24 columns"):
+        read_log(log)
+    log.write_text("1 " * 24 + "\n" + "1 " * 23 + "\n")
+    with pytest.raises(ValueError):
+        read_log(log)
+    with pytest.raises(ValueError, match="Empty"):
+        read_log(io.BytesIO(b""))
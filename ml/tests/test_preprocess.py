@@ -0,0 +1,107 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import write_log
+
+from mhealth import preprocess
+from mhealth.constants import LABEL_COLUMN, SENSOR_COLUMNS, SUBJECT_COLUMN, TIMESTAMP_COLUMN
+from mhealth.data import load_subject_log
+from mhealth.preprocess import DEFAULT_STATS, create_windows, extract_features, window_features
+
+
+def sensor_values(n_rows: int = 2000, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(n_rows, 23)).round(2)  # rounding creates ties
+    values[300:700, 5] = 1.5  # flat stretch: zero std/mad
+    return values
+
+
+@pytest.mark.parametrize("window_size, step", [(50, 5), (100, 25), (64, 64), (51, 7), (10, 30)])
+def test_rolling_engine_matches_batched(window_size, step):
+    values = sensor_values()
+    labels = np.repeat(np.arange(4), 500)
+    X_batched, y_batched = window_features(
+        values, labels, window_size, step, DEFAULT_STATS, engine="batched"
+    )
+    X_rolling, y_rolling = window_features(
+        values, labels, window_size, step, DEFAULT_STATS, engine="rolling"
+    )
+    assert X_rolling.shape == X_batched.shape
+    np.testing.assert_allclose(X_rolling, X_batched, rtol=0, atol=1e-9)
+    np.testing.assert_array_equal(y_rolling, y_batched)
+
+
+def legacy_windows(df, window_size, step, stats):
+    # The original per-window loop create_windows replaced.
+    rows = []
+    for subject_id, group in df.groupby(df[SUBJECT_COLUMN]):
+        group = group.sort_values(TIMESTAMP_COLUMN)
+        for start in range(0, len(group) - window_size + 1, step):
+            window = group.iloc[start : start + window_size]
+            row = extract_features(window[SENSOR_COLUMNS], feature_stats=stats)
+            row[LABEL_COLUMN] = int(window[LABEL_COLUMN].mode().iloc[0])
+            row[SUBJECT_COLUMN] = subject_id
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize("engine", ["batched", "rolling"])
+@pytest.mark.parametrize("stats", [DEFAULT_STATS, ["max", "mad", "mean"]])
+def test_create_windows_matches_per_window_extract_features(tmp_path, engine, stats):
+    df = pd.concat(
+        [
+            load_subject_log(
+                write_log(tmp_path / f"mHealth_subject{s}.log", 1200, seed=s), s, 50, cache_dir=None
+            )
+            for s in (3, 1)
+        ],
+        ignore_index=True,
+    ).sample(frac=1.0, random_state=0)  # create_windows must restore time order
+    expected = legacy_windows(df, 100, 40, stats)
+    result = create_windows(df, 2.0, 1.2, 50, feature_stats=stats, engine=engine)
+
+    assert list(result.columns) == list(expected.columns)
+    features = [c for c in expected.columns if c not in (LABEL_COLUMN, SUBJECT_COLUMN)]
+    np.testing.assert_allclose(result[features], expected[features], rtol=1e-9, atol=1e-9)
+    np.testing.assert_array_equal(result[LABEL_COLUMN], expected[LABEL_COLUMN])
+    np.testing.assert_array_equal(result[SUBJECT_COLUMN], expected[SUBJECT_COLUMN])
+
+
+def subject_frame(tmp_path, subjects=(1, 2, 3), n_rows=1500):
+    return pd.concat(
+        [
+            load_subject_log(
+                write_log(tmp_path / f"mHealth_subject{s}.log", n_rows, seed=s), s, 50, cache_dir=None
+            )
+            for s in subjects
+        ],
+        ignore_index=True,
+    )
+
+
+@pytest.mark.parametrize("engine", ["batched", "rolling"])
+def test_parallel_windows_match_serial(tmp_path, engine):
+    df = subject_frame(tmp_path)
+    serial = create_windows(df, 2.0, 1.0, 50, engine=engine, workers=1)
+    parallel = create_windows(df, 2.0, 1.0, 50, engine=engine, workers=2)
+    assert parallel.equals(serial)
+
+
+def test_parallel_windows_unlink_shared_memory_on_error(tmp_path, monkeypatch):
+    created = []
+
+    class RecordingSharedMemory(shared_memory.SharedMemory):
+        def __init__(self, *args, create=False, **kwargs):
+            super().__init__(*args, create=create, **kwargs)
+            if create:
+                created.append(self.name)
+
+    monkeypatch.setattr(preprocess.shared_memory, "SharedMemory", RecordingSharedMemory)
+    with pytest.raises(ValueError, match="Unknown feature engine"):
+        create_windows(subject_frame(tmp_path), 2.0, 1.0, 50, engine="bogus", workers=2)
+    assert len(created) == 2
+    for name in created:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
@@ -8,8 +8,18 @@ ROOT = pathlib.Path(__file__).resolve().parent
 sys.path.append(str(ROOT / "src"))
 
 from mhealth.config import load_config
-from mhealth.data import load_dataset, load_demo_subjects
-from mhealth.modeling import save_artifacts, train_model
+from mhealth.data import MHealthDataset, load_dataset, load_demo_subjects
+from mhealth.feature_store import FeatureStore
+from mhealth.modeling import (
+    build_windows,
+    cross_validate_loso,
+    save_artifacts,
+    save_cv_metrics,
+    train_incremental,
+    train_model,
+    train_on_windows,
+)
+from mhealth.profiling import profile, stage
 
 
 def parse_args() -> argparse.Namespace:
@@ -17,32 +27,149 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--config", default="config/config.yaml", help="Path to config YAML."
     )
+    parser.add_argument(
+        "--cv",
+        choices=["loso"],
+        help="Cross-validation mode instead of a single train/val/test split.",
+    )
+    parser.add_argument(
+        "--cv-jobs",
+        type=int,
+        default=-1,
+        help="Folds trained in parallel (-1 = all cores).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Grow the saved model with subjects it has not seen instead of retraining.",
+    )
+    parser.add_argument(
+        "--subjects",
+        type=int,
+        nargs="+",
+        help="New subjects for --incremental (default: every unseen non-demo subject).",
+    )
     return parser.parse_args()
 
 
-def main() -> None:
-    args = parse_args()
-    config = load_config(args.config)
+def run_incremental(config, dataset, subject_ids) -> None:
+    print("\n" + "=" * 60)
+    print("ACTUALIZACIÓN INCREMENTAL DEL MODELO")
+    print("=" * 60)
+    artifacts = train_incremental(dataset, config, subject_ids=subject_ids)
+    if artifacts is None:
+        print("[INFO] No hay sujetos nuevos; el modelo no cambia.")
+        return
+
+    update = artifacts["lineage"][-1]
+    print(f"[INFO] Sujetos nuevos: {update['added_subjects']}")
+    print(
+        f"[INFO] Ventanas nuevas: {update['n_new_windows']} (previas: {update['n_old_windows']})"
+    )
+    print(
+        f"[INFO] Árboles: {update['trees_before']} + {update['trees_added']} = "
+        f"{update['n_estimators']} ({update['seconds']:.2f}s)"
+    )
+    save_artifacts(artifacts, config)
+    for split, metrics in artifacts["metrics"].items():
+        if metrics["accuracy"] is not None:
+            print(
+                f"{split}: acc={metrics['accuracy']:.4f}, macro_f1={metrics['macro_f1']:.4f}"
+            )
+
 
+def run_loso(config, dataset, cv_jobs: int) -> None:
+    print("\nCargando ventanas de entrenamiento (excluyendo sujetos demo)...")
+    if config.features.get("store", False):
+        windows = FeatureStore(config).windows(dataset, dataset.train_subject_ids)
+    else:
+        windows = build_windows(load_dataset(config, exclude_demo=True, dataset=dataset), config)
+    print(f"[INFO] Ventanas de entrenamiento: {len(windows)}")
+
+    print("\n" + "=" * 60)
+    print("VALIDACIÓN CRUZADA LEAVE-ONE-SUBJECT-OUT")
+    print("=" * 60)
+    results = cross_validate_loso(windows, config, n_jobs=cv_jobs)
+    path = save_cv_metrics(results, config)
+
+    for fold in results["folds"]:
+        print(
+            f"sujeto {fold['subject']:>2}: acc={fold['accuracy']:.4f}, "
+            f"macro_f1={fold['macro_f1']:.4f} ({fold['wall_seconds']:.2f}s)"
+        )
+    agg = results["aggregate"]
+    print(
+        f"\nPromedio: acc={agg['accuracy_mean']:.4f}±{agg['accuracy_std']:.4f}, "
+        f"macro_f1={agg['macro_f1_mean']:.4f}±{agg['macro_f1_std']:.4f}"
+    )
+    print(f"Total: {agg['n_folds']} folds en {agg['wall_seconds']:.2f}s -> {path}")
+
+
+def run_training(config, args) -> str:
     print("=" * 60)
     print("CARGANDO DATOS CON EXCLUSIÓN DE SUJETOS DEMO")
     print("=" * 60)
 
-    # Cargar dataset SIN sujetos demo (9, 10)
-    print("\nCargando dataset de entrenamiento (excluyendo sujetos demo)...")
-    df = load_dataset(config, exclude_demo=True)
+    # Indexar los archivos una sola vez para ambas cargas
+    with stage("index_dataset") as info:
+        dataset = MHealthDataset(config)
+        info["subjects"] = len(dataset)
 
-    # Cargar sujetos demo por separado (solo para evaluación)
-    print("\nCargando sujetos demo para evaluación...")
-    demo_df = load_demo_subjects(config)
+    if args.cv == "loso":
+        with stage("cross_validate"):
+            run_loso(config, dataset, args.cv_jobs)
+        return "loso"
+    if args.incremental:
+        with stage("incremental"):
+            run_incremental(config, dataset, args.subjects)
+        return "incremental"
 
-    print("\n" + "=" * 60)
-    print("ENTRENANDO MODELO")
-    print("=" * 60)
-    artifacts = train_model(df, config, demo_df=demo_df)
+    if config.features.get("store", False):
+        # Ventanas por sujeto desde el almacén de características
+        store = FeatureStore(config)
+        print("\nCargando ventanas de entrenamiento (excluyendo sujetos demo)...")
+        with stage("load_train_windows"):
+            windows = store.windows(dataset, dataset.train_subject_ids)
+        print(f"[INFO] Ventanas de entrenamiento: {len(windows)}")
+        print("\nCargando ventanas de sujetos demo para evaluación...")
+        with stage("load_demo_windows"):
+            demo_windows = store.windows(dataset, dataset.demo_subject_ids)
+        print(f"[INFO] Ventanas demo: {len(demo_windows)}")
+
+        print("\n" + "=" * 60)
+        print("ENTRENANDO MODELO")
+        print("=" * 60)
+        with stage("train"):
+            artifacts = train_on_windows(windows, config, demo_windows=demo_windows)
+    else:
+        # Cargar dataset SIN sujetos demo (9, 10)
+        print("\nCargando dataset de entrenamiento (excluyendo sujetos demo)...")
+        with stage("load_dataset") as info:
+            df = load_dataset(config, exclude_demo=True, dataset=dataset)
+            info["rows"] = len(df)
+
+        # Cargar sujetos demo por separado (solo para evaluación)
+        print("\nCargando sujetos demo para evaluación...")
+        with stage("load_demo_subjects") as info:
+            demo_df = load_demo_subjects(config, dataset=dataset)
+            info["rows"] = len(demo_df)
+
+        print("\n" + "=" * 60)
+        print("ENTRENANDO MODELO")
+        print("=" * 60)
+        with stage("train"):
+            artifacts = train_model(df, config, demo_df=demo_df)
+
+    if "forest_sizing" in artifacts:
+        sizing = artifacts["forest_sizing"]
+        print(
+            f"[INFO] Tamaño del bosque ({sizing['metric']}): {sizing['n_estimators']} árboles "
+            f"de {sizing['max_estimators']} (macro F1 {sizing['best_macro_f1']:.4f})"
+        )
 
     print("\nSaving artifacts...")
-    save_artifacts(artifacts, config)
+    with stage("save_artifacts"):
+        save_artifacts(artifacts, config)
 
     print("\n" + "=" * 60)
     print("MÉTRICAS FINALES")
@@ -52,6 +179,25 @@ def main() -> None:
             print(
                 f"{split}: acc={metrics['accuracy']:.4f}, macro_f1={metrics['macro_f1']:.4f}"
             )
+    return "train"
+
+
+def main() -> None:
+    args = parse_args()
+    config = load_config(args.config)
+
+    with profile() as profiler:
+        mode = run_training(config, args)
+
+    path = config.artifacts.get("timings", f"{config.artifacts['dir']}/timings.json")
+    profiler.save(path, version=config.version, mode=mode)
+    print(f"\n[INFO] Tiempos por etapa -> {path}")
+    for record in profiler.stages:
+        if "/" not in record["stage"]:
+            print(
+                f"  {record['stage']:<20} {record['wall_seconds']:8.2f}s "
+                f"(cpu {record['cpu_seconds']:.2f}s)"
+            )
 
 
 if __name__ == "__main__":
@@ -14,11 +14,7 @@ sys.path.append(str(ROOT / "src"))
 from mhealth.config import load_config
 from mhealth.data import load_dataset
 from mhealth.constants import LABEL_COLUMN, SUBJECT_COLUMN, SENSOR_COLUMNS
-from mhealth.preprocess import (
-    filter_demo_subjects,
-    filter_unlabeled_activity,
-    split_by_subject,
-)
+from mhealth.preprocess import split_rows, subject_rows
 from mhealth.inference import load_artifacts
 
 
@@ -37,10 +33,14 @@ def verify_no_leakage():
 
     # Paso 2: Verificar separación
     print("\n2. Verificando separación de datos...")
-    remaining, demo_df = filter_demo_subjects(df, config.excluded_subjects_demo)
+    # Índices de filas por sujeto (sin actividad 0): ninguna copia del DataFrame
+    rows = subject_rows(df, drop_unlabeled=True)
+    demo_ids = {int(s) for s in config.excluded_subjects_demo}
+    remaining = {s: idx for s, idx in rows.items() if s not in demo_ids}
+    demo_rows = {s: idx for s, idx in rows.items() if s in demo_ids}
 
-    remaining_subjects = sorted(remaining[SUBJECT_COLUMN].unique())
-    demo_subjects = sorted(demo_df[SUBJECT_COLUMN].unique())
+    remaining_subjects = sorted(remaining)
+    demo_subjects = sorted(demo_rows)
 
     print(f"   Sujetos para entrenamiento: {remaining_subjects}")
     print(f"   Sujetos para demo (excluidos): {demo_subjects}")
@@ -55,12 +55,11 @@ def verify_no_leakage():
 
     # Paso 3: Verificar split train/val/test
     print("\n3. Verificando split train/val/test...")
-    remaining_filtered = filter_unlabeled_activity(remaining)
-    train_df, val_df, test_df = split_by_subject(remaining_filtered, config)
+    train_rows, val_rows, test_rows = split_rows(remaining, config)
 
-    train_subjects = sorted(train_df[SUBJECT_COLUMN].unique())
-    val_subjects = sorted(val_df[SUBJECT_COLUMN].unique())
-    test_subjects = sorted(test_df[SUBJECT_COLUMN].unique())
+    train_subjects = sorted(train_rows)
+    val_subjects = sorted(val_rows)
+    test_subjects = sorted(test_rows)
 
     print(f"   Train subjects: {train_subjects}")
     print(f"   Val subjects: {val_subjects}")
@@ -104,13 +103,17 @@ def verify_no_leakage():
     # El scaler se entrena solo con X_train, que viene de train_subjects
     # Podemos verificar esto comprobando que los datos de demo son diferentes
 
-    demo_filtered = filter_unlabeled_activity(demo_df)
+    sensors = df[SENSOR_COLUMNS].to_numpy()
+    n_train = sum(len(idx) for idx in train_rows.values())
+    n_val = sum(len(idx) for idx in val_rows.values())
+    n_test = sum(len(idx) for idx in test_rows.values())
+    n_demo = sum(len(idx) for idx in demo_rows.values())
 
     # Estadísticas de los datos de entrenamiento vs demo
-    train_means = train_df[SENSOR_COLUMNS].mean()
-    demo_means = demo_filtered[SENSOR_COLUMNS].mean()
+    train_means = sum(sensors[idx].sum(axis=0) for idx in train_rows.values()) / n_train
+    demo_means = sum(sensors[idx].sum(axis=0) for idx in demo_rows.values()) / max(n_demo, 1)
 
-    diff = (train_means - demo_means).abs().mean()
+    diff = np.abs(train_means - demo_means).mean()
     print(f"   Diferencia promedio en medias de sensores: {diff:.4f}")
 
     if diff > 0:
@@ -149,15 +152,15 @@ def verify_no_leakage():
 
     # Paso 7: Prueba adicional - entrenar sin algunos sujetos y ver generalización
     print("\n7. Verificación final con conteo de muestras:")
-    print(f"   Muestras en train: {len(train_df)}")
-    print(f"   Muestras en val: {len(val_df)}")
-    print(f"   Muestras en test: {len(test_df)}")
-    print(f"   Muestras en demo (sujetos 9,10): {len(demo_filtered)}")
+    print(f"   Muestras en train: {n_train}")
+    print(f"   Muestras en val: {n_val}")
+    print(f"   Muestras en test: {n_test}")
+    print(f"   Muestras en demo (sujetos 9,10): {n_demo}")
 
-    total_train_val_test = len(train_df) + len(val_df) + len(test_df)
+    total_train_val_test = n_train + n_val + n_test
     print(f"   Total train+val+test: {total_train_val_test}")
     print(
-        f"   Proporción demo/total: {len(demo_filtered) / (total_train_val_test + len(demo_filtered)) * 100:.1f}%"
+        f"   Proporción demo/total: {n_demo / (total_train_val_test + n_demo) * 100:.1f}%"
     )
 
     print("\n" + "=" * 70)